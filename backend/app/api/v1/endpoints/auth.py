@@ -40,5 +40,5 @@ async def login(request: Request, form_data: Annotated[OAuth2PasswordRequestForm
 
 @router.get("/me")
 @limiter.limit("60/minute")
-async def read_current_user(request: Request, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+async def read_current_user(request: Request, current_user = Depends(get_current_user)):
     return {"id": current_user.id, "name": current_user.name, "email": current_user.email, "organizations": [{"id": org.id, "name": org.name} for org in current_user.organizations]}
@@ -1,21 +1,29 @@
+import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
+from uuid import UUID
+import redis
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.dependencies.auth_dependencies import get_current_user
-from app.crud.organizations import require_org_member
-from app.crud.ingestions import create_ingestion as create_ingestion_crud, check_ingestion_in_project, get_finding_details, get_group_overview, get_ingestion_scoped, get_ingestions_for_project, get_ingestion_stats, get_top_fingerprints_for_ingestion, list_ingestion_events, serialize_log, create_insights_data, delete_ingestion
+from app.db import AsyncSessionLocal, get_async_db, get_db
+from app.dependencies.auth_dependencies import IngestionScope, get_current_user, get_ingestion_scope, get_ingestion_scope_async
+from app.crud.organizations import get_cached_membership, require_org_member
+from app.crud.ingestions import create_ingestion as create_ingestion_crud, check_ingestion_in_project, get_finding_details, get_group_overview, get_ingestions_for_project, get_ingestion_event, get_ingestion_stats, get_top_fingerprints_for_ingestion, list_ingestion_events, serialize_log, serialize_log_detail, delete_ingestion
 from app.crud.projects import check_project_in_organization
 from app.schemas.ingestions import IngestionCreateRequest, IngestionPasteLogsRequest, InsightGenRequest
-from app.utils.storage import save_ingestion_text
+from app.config import settings
+from app.utils.storage import UploadDecodeError, UploadTooLargeError, save_ingestion_stream, save_ingestion_text
 from app.tasks.ingestion_processing import process_ingestion
 from app.models.ai_analysis import AiAnalysis
-from app.utils.ai_insights import generate_insights as generate_insights_util
-from app.crud.ai_analyses import create_ai_analysis, find_ai_analysis
+from app.tasks.insight_generation import generate_insight as generate_insight_task
+from app.crud.ai_analyses import get_ai_analysis, is_insight_job_active, queue_ai_analysis, serialize_ai_analysis
 from app.security.rate_limit import limiter
 from app.security.user_rate_limit import enforce_user_limit
+from app.utils.ingestion_cache import cached_ingestion_response_async, invalidate_ingestion_cache
+from app.utils.insight_stream import read_insight_stream, reset_insight_stream, sse_event
 
 router = APIRouter()
 
@@ -44,6 +52,7 @@ def paste_logs(request: Request, org_id: str, project_id: str, ingestion_id: str
     if not ingestion:
         raise HTTPException(status_code=404, detail="Ingestion not found in this project")
     save_ingestion_text(ingestion_id, payload.text)
+    invalidate_ingestion_cache(ingestion.id)
     process_ingestion.delay(ingestion_id)
     return {"message": "Logs saved successfully."}
 
@@ -59,31 +68,29 @@ def upload_logs(request: Request, org_id: str, project_id: str, ingestion_id: st
     ingestion = check_ingestion_in_project(db, ingestion_id=ingestion_id, project_id=project.id)
     if not ingestion:
         raise HTTPException(status_code=404, detail="Ingestion not found in this project")
-    content = file.file.read().decode("utf-8")
-    save_ingestion_text(ingestion_id, content)
+    try:
+        save_ingestion_stream(ingestion_id, file.file, max_bytes=settings.max_body_size)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail=f"Log file exceeds the {settings.max_body_size} byte limit")
+    except UploadDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    invalidate_ingestion_cache(ingestion.id)
     process_ingestion.delay(ingestion_id)
     return {"message": "Logs uploaded and saved successfully."}
     
 @router.get("/{ingestion_id}")
 @limiter.limit("60/minute")
-def get_ingestion(request: Request, org_id: str, project_id: str, ingestion_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+def get_ingestion(request: Request, org_id: str, project_id: str, ingestion_id: str, scope: IngestionScope = Depends(get_ingestion_scope)):
+    ingestion = scope.ingestion
     return {"id": ingestion.id, "project_id": ingestion.project_id, "source_type": ingestion.source_type, "status": ingestion.status}
 
 @router.get("/{ingestion_id}/overview")
 @limiter.limit("60/minute")
-def get_ingestion_overview(request: Request, org_id: str, project_id: str, ingestion_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+async def get_ingestion_overview(request: Request, org_id: str, project_id: str, ingestion_id: str, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    return await cached_ingestion_response_async(ingestion, "overview", {}, lambda: db.run_sync(build_overview, ingestion))
+
+def build_overview(db, ingestion):
     stats = get_ingestion_stats(db, ingestion=ingestion)
     return {
         "ingestion": 
@@ -115,13 +122,11 @@ def get_ingestion_overview(request: Request, org_id: str, project_id: str, inges
 
 @router.get("/{ingestion_id}/groups")
 @limiter.limit("60/minute")
-def get_ingestion_groups(request: Request, org_id: str, project_id: str, ingestion_id: str, offset: int = 0, limit: int = 10, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+async def get_ingestion_groups(request: Request, org_id: str, project_id: str, ingestion_id: str, offset: int = 0, limit: int = 10, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    return await cached_ingestion_response_async(ingestion, "groups", {"offset": offset, "limit": limit}, lambda: db.run_sync(build_groups_page, ingestion, offset, limit))
+
+def build_groups_page(db, ingestion, offset, limit):
     groups = get_top_fingerprints_for_ingestion(db=db, ingestion_id=ingestion.id, limit=limit + 1, offset=offset)
     page = groups[:limit]
     has_more = len(groups) > limit
@@ -131,7 +136,7 @@ def get_ingestion_groups(request: Request, org_id: str, project_id: str, ingesti
 @router.get("/")
 @limiter.limit("60/minute")
 def list_ingestions(request: Request, org_id: str, project_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
+    org_membership = get_cached_membership(db, org_id, current_user.id)
     if not org_membership:
         raise HTTPException(status_code=403, detail="Not a member of this organization")
     project = check_project_in_organization(db, project_id=project_id, org_id=org_id)
@@ -140,47 +145,48 @@ def list_ingestions(request: Request, org_id: str, project_id: str, db: Session
     ingestions = get_ingestions_for_project(db, project_id=project.id)
     return [{"id": ingestion.id, "project_id": ingestion.project_id, "source_type": ingestion.source_type, "status": ingestion.status} for ingestion in ingestions]
 
-@limiter.limit("60/minute")
 @router.get("/{ingestion_id}/events")
-def get_ingestion_events(request: Request, org_id: str, project_id: str, ingestion_id: str, 
+@limiter.limit("60/minute")
+async def get_ingestion_events(request: Request, org_id: str, project_id: str, ingestion_id: str, 
                          cursor: int = 0, limit: int = Query(100, gt=0, le=500), 
                          levels: Optional[str] = Query(None), service: Optional[str] = Query(None), 
                          fingerprint: Optional[str] = Query(None), ts_from: Optional[datetime] = Query(None), 
                          ts_to: Optional[datetime] = Query(None), q: Optional[str] = Query(None), 
-                         db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
-    events = list_ingestion_events(db, ingestion_id=ingestion.id, cursor=cursor, limit=limit + 1, levels=levels, service=service, fingerprint=fingerprint, ts_from=ts_from, ts_to=ts_to, q=q)
+                         q_mode: Literal["contains", "fuzzy"] = Query("contains"),
+                         scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    events = await db.run_sync(lambda sync_db: list_ingestion_events(sync_db, ingestion_id=ingestion.id, cursor=cursor, limit=limit + 1, levels=levels, service=service, fingerprint=fingerprint, ts_from=ts_from, ts_to=ts_to, q=q, q_mode=q_mode))
     page = events[:limit]
     has_more = len(events) > limit
     next_cursor = page[-1].seq if (has_more and page) else None
     return {"items": [serialize_log(event) for event in page], "next_cursor": next_cursor, "has_more": has_more}
 
+@router.get("/{ingestion_id}/events/{event_id}")
+@limiter.limit("60/minute")
+def get_ingestion_event_detail(request: Request, org_id: str, project_id: str, ingestion_id: str, event_id: UUID, scope: IngestionScope = Depends(get_ingestion_scope), db: Session = Depends(get_db)):
+    ingestion = scope.ingestion
+    event = get_ingestion_event(db, ingestion_id=ingestion.id, event_id=event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found in this ingestion")
+    return serialize_log_detail(event)
+
 @router.get("/{ingestion_id}/findings")
 @limiter.limit("60/minute")
-def get_ingestion_findings(request: Request, org_id: str, project_id: str, ingestion_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+async def get_ingestion_findings(request: Request, org_id: str, project_id: str, ingestion_id: str, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    return await cached_ingestion_response_async(ingestion, "findings", {}, lambda: db.run_sync(build_findings_list, ingestion))
+
+def build_findings_list(db, ingestion):
     findings = ingestion.findings or []
     return {"count": len(findings), "items": findings}
 
-@limiter.limit("60/minute")
 @router.get("/{ingestion_id}/findings/{finding_id}")
-def get_ingestion_finding_details(request: Request, org_id: str, project_id: str, ingestion_id: str, finding_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+@limiter.limit("60/minute")
+async def get_ingestion_finding_details(request: Request, org_id: str, project_id: str, ingestion_id: str, finding_id: str, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    return await cached_ingestion_response_async(ingestion, "finding", {"id": finding_id}, lambda: db.run_sync(build_finding_details, ingestion, finding_id))
+
+def build_finding_details(db, ingestion, finding_id):
     finding = get_finding_details(db, finding_id=finding_id, ingestion_id=ingestion.id)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found in this ingestion")
@@ -191,15 +197,14 @@ def get_ingestion_finding_details(request: Request, org_id: str, project_id: str
         "evidence_preview": finding["evidence_preview"],
         "insight": insight_result,
     }
-@limiter.limit("60/minute")
+
 @router.get("/{ingestion_id}/groups/{fingerprint}")
-def get_ingestion_group_details(request: Request, org_id: str, project_id: str, ingestion_id: str, fingerprint: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+@limiter.limit("60/minute")
+async def get_ingestion_group_details(request: Request, org_id: str, project_id: str, ingestion_id: str, fingerprint: str, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    ingestion = scope.ingestion
+    return await cached_ingestion_response_async(ingestion, "group", {"fingerprint": fingerprint}, lambda: db.run_sync(build_group_details, ingestion, fingerprint))
+
+def build_group_details(db, ingestion, fingerprint):
     events = get_group_overview(db, ingestion_id=ingestion.id, fingerprint=fingerprint)
     if not events:
         raise HTTPException(status_code=404, detail="Group not found in this ingestion")
@@ -222,38 +227,89 @@ def get_ingestion_group_details(request: Request, org_id: str, project_id: str,
     }
 
 @limiter.limit("2/minute")
-@router.post("/{ingestion_id}/insights")
-def generate_insights(request: Request, payload: InsightGenRequest, org_id: str, project_id: str, ingestion_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    enforce_user_limit(str(current_user.id), limit=2)
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+@router.post("/{ingestion_id}/insights", status_code=202)
+def generate_insights(request: Request, payload: InsightGenRequest, org_id: str, project_id: str, ingestion_id: str, scope: IngestionScope = Depends(get_ingestion_scope), db: Session = Depends(get_db)):
+    enforce_user_limit(str(scope.user.id), limit=2)
+    ingestion = scope.ingestion
     if ingestion.status != "done":
         raise HTTPException(status_code=400, detail="Ingestion must be in 'done' status to generate insights")
-    # check if there's existing insight for this scope
-    existing_insight = find_ai_analysis(db, ingestion_id=ingestion.id, scope_type=payload.scope_type, scope_id=payload.fingerprint or payload.finding_id)
-    if existing_insight:
-        db.delete(existing_insight)
-        db.commit()
-    insight_data, error = create_insights_data(db, payload.scope_type, ingestion, fingerprint=payload.fingerprint, finding_id=payload.finding_id)
-    if not insight_data:
-        raise HTTPException(status_code=400, detail=error)
-    print(insight_data)
-    result = generate_insights_util(insight_data)
-    create_ai_analysis(db, ingestion_id=ingestion.id, scope_type=payload.scope_type, scope_id=payload.fingerprint or payload.finding_id, result=result)
-    return {"insight": result}
+    if payload.scope_type == "group" and not payload.fingerprint:
+        raise HTTPException(status_code=400, detail="Fingerprint is required for group-scoped insights")
+    if payload.scope_type == "finding" and not payload.finding_id:
+        raise HTTPException(status_code=400, detail="Finding ID is required for finding-scoped insights")
+    # the LLM round trip runs on a worker; poll GET /insights/{job_id} for the result
+    analysis, queued = queue_ai_analysis(db, ingestion_id=ingestion.id, scope_type=payload.scope_type, scope_id=payload.fingerprint or payload.finding_id)
+    if queued:
+        reset_insight_stream(analysis.id)
+        generate_insight_task.delay(str(analysis.id))
+    return {"job_id": str(analysis.id), "status": analysis.status}
+
+@router.get("/{ingestion_id}/insights/{job_id}")
+@limiter.limit("120/minute")
+def get_insight_status(request: Request, org_id: str, project_id: str, ingestion_id: str, job_id: str, scope: IngestionScope = Depends(get_ingestion_scope), db: Session = Depends(get_db)):
+    analysis = get_ai_analysis(db, ingestion_id=scope.ingestion.id, analysis_id=job_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Insight job not found in this ingestion")
+    return serialize_ai_analysis(analysis)
+
+# how long the SSE stream waits for new tokens before sending a keepalive and re-checking the job
+INSIGHT_STREAM_POLL_MS = 15_000
+
+@router.get("/{ingestion_id}/insights/{job_id}/stream")
+@limiter.limit("30/minute")
+async def stream_insight(request: Request, org_id: str, project_id: str, ingestion_id: str, job_id: str, scope: IngestionScope = Depends(get_ingestion_scope_async), db: AsyncSession = Depends(get_async_db)):
+    """Server-Sent Events for an insight job: "delta" events with text as the model writes it, then one "done" or "failed" event"""
+    analysis = await db.run_sync(get_ai_analysis, scope.ingestion.id, job_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Insight job not found in this ingestion")
+    job = serialize_ai_analysis(analysis)
+    active = is_insight_job_active(analysis)
+    # the stream can outlive any request; don't keep the pooled connection for it
+    await db.close()
+    return StreamingResponse(
+        insight_events(request, scope.ingestion.id, job, active),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def insight_final_event(job: dict) -> str:
+    if job["status"] == "done":
+        return sse_event("done", {"insight": job["insight"]})
+    return sse_event("failed", {"error": job["error"] or "Insight generation failed"})
+
+async def insight_events(request: Request, ingestion_id, job: dict, active: bool):
+    if not active:
+        yield insight_final_event(job)
+        return
+    last_id = "0"
+    while not await request.is_disconnected():
+        try:
+            entries = await read_insight_stream(job["job_id"], last_id, block_ms=INSIGHT_STREAM_POLL_MS)
+        except redis.RedisError:
+            entries = []
+            await asyncio.sleep(1)
+        if not entries:
+            # quiet stream: the worker may have finished without Redis, or died; the stored row decides
+            async with AsyncSessionLocal() as db:
+                analysis = await db.run_sync(get_ai_analysis, ingestion_id, job["job_id"])
+                if analysis is None or not is_insight_job_active(analysis):
+                    yield insight_final_event(serialize_ai_analysis(analysis) if analysis else {"status": "failed", "error": "Insight job was deleted"})
+                    return
+            yield ": keepalive\n\n"
+            continue
+        for entry_id, fields in entries:
+            last_id = entry_id
+            if fields["type"] == "delta":
+                yield sse_event("delta", {"text": fields["text"]})
+            else:
+                yield insight_final_event({"status": fields["status"], "insight": fields["insight"], "error": fields["error"]})
+                return
 
 @limiter.limit("60/minute")
 @router.delete("/{ingestion_id}")
-def delete_ingestion_endpoint(request: Request, org_id: str, project_id: str, ingestion_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    org_membership = require_org_member(db, org_id, current_user.id)
-    if not org_membership:
-        raise HTTPException(status_code=403, detail="Not a member of this organization")
-    ingestion = get_ingestion_scoped(db, ingestion_id=ingestion_id, project_id=project_id, org_id=org_id)
-    if not ingestion:
-        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+def delete_ingestion_endpoint(request: Request, org_id: str, project_id: str, ingestion_id: str, scope: IngestionScope = Depends(get_ingestion_scope), db: Session = Depends(get_db)):
+    ingestion = scope.ingestion
+    deleted_id = ingestion.id
     delete_ingestion(db, ingestion)
+    invalidate_ingestion_cache(deleted_id)
     return {"message": "Ingestion deleted successfully."}
\ No newline at end of file
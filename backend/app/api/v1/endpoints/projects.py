@@ -5,7 +5,7 @@ from app.db import get_db
 from app.dependencies.auth_dependencies import get_current_user
 from app.schemas.projects import ProjectCreateRequest
 from app.crud.projects import create_project as create_project_crud, get_projects_by_org, delete_project as delete_project_crud
-from app.crud.organizations import get_membership, require_org_admin
+from app.crud.organizations import get_cached_membership, get_membership, require_org_admin
 from app.security.rate_limit import limiter
 
 router = APIRouter()
@@ -36,7 +36,7 @@ def list_projects(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    membership = get_membership(db, org_id=org_id, user_id=str(current_user.id))
+    membership = get_cached_membership(db, org_id=org_id, user_id=str(current_user.id))
     if not membership:
         raise HTTPException(status_code=403, detail="Not a member of this organization")
 
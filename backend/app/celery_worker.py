@@ -1,6 +1,10 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+import os
 import time
 from app.config import settings
+from app.db import dispose_engines_after_fork
+from app.utils.metrics import mark_worker_process_dead, start_worker_metrics_server
 
 REDIS_URL = settings.redis_url
 
@@ -11,5 +15,19 @@ celery = Celery(
     backend=REDIS_URL, 
 )
 
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    # prefork children inherit the parent's pooled connections; sharing a socket across processes corrupts it
+    dispose_engines_after_fork()
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    if settings.worker_metrics_port:
+        start_worker_metrics_server(settings.worker_metrics_port)
+
+@worker_process_shutdown.connect
+def release_process_metrics(**kwargs):
+    mark_worker_process_dead(os.getpid())
+
 from app.tasks import ingestion_processing
-from app.tasks import findings_engine
\ No newline at end of file
+from app.tasks import insight_generation
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -5,12 +6,23 @@ class Settings(BaseSettings):
     # LLM / AI
     groq_api_key: str = Field(..., env="GROQ_API_KEY")
     groq_llm_model: str = Field(default="llama-3.3-70b-versatile", env="GROQ_LLM_MODEL")
+    groq_base_url: Optional[str] = Field(default=None, env="GROQ_BASE_URL")  # e.g. a proxy or a local fake server
 
     # Application environment
     env: str = Field(default="local", env="ENV")
 
     # Core Services
     database_url: str = Field(..., env="DATABASE_URL")
+    async_database_url: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")  # defaults to DATABASE_URL with asyncpg
+
+    # Database Connection Pool (per engine, per process)
+    db_pool_size: int = Field(default=5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: int = Field(default=30, env="DB_POOL_TIMEOUT")  # seconds to wait for a free connection
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")  # seconds, -1 disables
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=0, env="DB_STATEMENT_TIMEOUT_MS")  # 0 disables
+    db_pgbouncer: bool = Field(default=False, env="DB_PGBOUNCER")  # DATABASE_URL points at PgBouncer in transaction pooling mode
     redis_url: str = Field(..., env="REDIS_URL")
 
     # App Configuration
@@ -25,6 +37,29 @@ class Settings(BaseSettings):
 
     # Storage Configuration
     storage_dir: str = Field(default="./storage", env="STORAGE_DIR")
+    storage_compression: str = Field(default="zstd", env="STORAGE_COMPRESSION")  # "zstd" or "none"
+    storage_zstd_level: int = Field(default=3, env="STORAGE_ZSTD_LEVEL")
+
+    # Ingestion Processing
+    ingest_use_copy: bool = Field(default=True, env="INGEST_USE_COPY")  # COPY FROM STDIN instead of ORM inserts
+    ingest_parse_workers: int = Field(default=1, env="INGEST_PARSE_WORKERS")  # >1 enables multi-process parsing
+    ingest_parallel_min_bytes: int = Field(default=20_971_520, env="INGEST_PARALLEL_MIN_BYTES")  # 20MB
+    ingest_store_raw: bool = Field(default=False, env="INGEST_STORE_RAW")  # False keeps only each record's byte range in the stored file
+
+    # Membership Cache (per process, invalidated by crud/organizations mutations)
+    membership_cache_ttl_seconds: int = Field(default=30, env="MEMBERSHIP_CACHE_TTL_SECONDS")
+
+    # Response Cache (Redis, finished ingestions only)
+    ingestion_cache_enabled: bool = Field(default=True, env="INGESTION_CACHE_ENABLED")
+    ingestion_cache_ttl_seconds: int = Field(default=86_400, env="INGESTION_CACHE_TTL_SECONDS")
+
+    # AI Insight Cache (Redis, keyed by prompt + model + temperature)
+    insight_cache_enabled: bool = Field(default=True, env="INSIGHT_CACHE_ENABLED")
+    insight_cache_ttl_seconds: int = Field(default=604_800, env="INSIGHT_CACHE_TTL_SECONDS")  # 7 days
+    insight_cache_max_entries: int = Field(default=10_000, env="INSIGHT_CACHE_MAX_ENTRIES")
+
+    # Metrics (Prometheus; set PROMETHEUS_MULTIPROC_DIR when running several worker processes)
+    worker_metrics_port: int = Field(default=9100, env="WORKER_METRICS_PORT")  # Celery /metrics, 0 disables
 
     # Security Configuration
     allowed_origins: list[str] = Field(
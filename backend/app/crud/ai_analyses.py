@@ -1,14 +1,20 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import uuid
 from app.models.ai_analysis import AiAnalysis
 from app.utils.ai_insights import generate_prompt
 
-def create_ai_analysis(db: Session, ingestion_id: uuid.UUID, scope_type: str, scope_id: str, result: str) -> AiAnalysis:
+# an analysis still queued or running after this long lost its worker and may be queued again
+INSIGHT_JOB_STALE_AFTER = timedelta(minutes=5)
+
+def create_ai_analysis(db: Session, ingestion_id: uuid.UUID, scope_type: str, scope_id: str, result: str | None = None, status: str = "done") -> AiAnalysis:
     ai_analysis = AiAnalysis(
         ingestion_id=ingestion_id,
         scope_type=scope_type,
         scope_id=scope_id,
-        result=result
+        result=result,
+        status=status,
     )
     db.add(ai_analysis)
     db.commit()
@@ -16,4 +22,48 @@ def create_ai_analysis(db: Session, ingestion_id: uuid.UUID, scope_type: str, sc
     return ai_analysis
 
 def find_ai_analysis(db: Session, ingestion_id: uuid.UUID, scope_type: str, scope_id: str) -> AiAnalysis | None:
-    return db.query(AiAnalysis).filter_by(ingestion_id=ingestion_id, scope_type=scope_type, scope_id=scope_id).first()
\ No newline at end of file
+    return db.query(AiAnalysis).filter_by(ingestion_id=ingestion_id, scope_type=scope_type, scope_id=scope_id).first()
+
+def get_ai_analysis(db: Session, ingestion_id: uuid.UUID, analysis_id: str) -> AiAnalysis | None:
+    try:
+        analysis_id = uuid.UUID(analysis_id)
+    except ValueError:
+        return None
+    return db.query(AiAnalysis).filter_by(id=analysis_id, ingestion_id=ingestion_id).first()
+
+def is_insight_job_active(analysis: AiAnalysis) -> bool:
+    return analysis.status in ("queued", "running") and analysis.updated_at > datetime.now(timezone.utc) - INSIGHT_JOB_STALE_AFTER
+
+def queue_ai_analysis(db: Session, ingestion_id: uuid.UUID, scope_type: str, scope_id: str) -> tuple[AiAnalysis, bool]:
+    """Mark the analysis of a scope as queued, creating it if needed.
+
+    Returns (analysis, queued); queued is False when a job for the scope is already pending,
+    so the caller does not start a second one. A previous result stays readable until the
+    new job replaces it.
+    """
+    analysis = find_ai_analysis(db, ingestion_id=ingestion_id, scope_type=scope_type, scope_id=scope_id)
+    if analysis is None:
+        try:
+            return create_ai_analysis(db, ingestion_id=ingestion_id, scope_type=scope_type, scope_id=scope_id, status="queued"), True
+        except IntegrityError:
+            # a concurrent request created it first
+            db.rollback()
+            return find_ai_analysis(db, ingestion_id=ingestion_id, scope_type=scope_type, scope_id=scope_id), False
+    if is_insight_job_active(analysis):
+        return analysis, False
+    analysis.status = "queued"
+    analysis.error = None
+    db.commit()
+    db.refresh(analysis)
+    return analysis, True
+
+def serialize_ai_analysis(analysis: AiAnalysis) -> dict:
+    return {
+        "job_id": str(analysis.id),
+        "scope_type": analysis.scope_type,
+        "scope_id": analysis.scope_id,
+        "status": analysis.status,
+        "insight": analysis.result if analysis.status == "done" else None,
+        "error": analysis.error,
+        "updated_at": analysis.updated_at,
+    }
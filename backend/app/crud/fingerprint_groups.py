@@ -0,0 +1,76 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.fingerprint_group import FingerprintGroup
+from app.utils.timestamps import as_utc
+
+# rows per multi-row INSERT when saving groups
+GROUP_INSERT_BATCH_SIZE = 1000
+
+class FingerprintGroupAccumulator:
+    """Builds fingerprint_groups rows while log events stream past. Rows must be added in seq order.
+
+    The sample and latest-by-ts picks mirror the original queries
+    (ORDER BY ts DESC NULLS LAST, seq ASC / seq DESC).
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, row: dict):
+        fp = row["fingerprint"]
+        group = self.groups.get(fp)
+        if group is None:
+            group = self.groups[fp] = {
+                "fingerprint": fp,
+                "count": 0,
+                "first_seen": None,
+                "last_seen": None,
+                "latest_event_id": None,
+                "sample_event_id": None,
+                "latest_ts_event_id": None,
+                "level_counts": {},
+                "service_counts": {},
+            }
+        group["count"] += 1
+        group["latest_event_id"] = row["id"]
+
+        ts = row.get("ts")
+        if ts is not None:
+            ts = as_utc(ts)
+            if group["first_seen"] is None or ts < group["first_seen"]:
+                group["first_seen"] = ts
+            if group["last_seen"] is None or ts > group["last_seen"]:
+                group["last_seen"] = ts
+                group["sample_event_id"] = row["id"]
+                group["latest_ts_event_id"] = row["id"]
+            elif ts == group["last_seen"]:
+                group["latest_ts_event_id"] = row["id"]
+        elif group["last_seen"] is None:
+            # no timestamped event yet, so NULLS LAST falls back to seq order
+            if group["sample_event_id"] is None:
+                group["sample_event_id"] = row["id"]
+            group["latest_ts_event_id"] = row["id"]
+
+        level = row.get("level") or "UNKNOWN"
+        group["level_counts"][level] = group["level_counts"].get(level, 0) + 1
+        service = row.get("service") or "unknown"
+        group["service_counts"][service] = group["service_counts"].get(service, 0) + 1
+
+def save_fingerprint_groups(db: Session, ingestion_id, groups, batch_size: int = GROUP_INSERT_BATCH_SIZE):
+    """Replace the fingerprint groups of an ingestion; the caller commits"""
+    db.query(FingerprintGroup).filter(FingerprintGroup.ingestion_id == ingestion_id).delete()
+    batch = []
+    for group in groups:
+        batch.append({**group, "ingestion_id": ingestion_id})
+        if len(batch) >= batch_size:
+            db.execute(insert(FingerprintGroup), batch)
+            batch = []
+    if batch:
+        db.execute(insert(FingerprintGroup), batch)
+
+def get_fingerprint_group(db: Session, ingestion_id, fingerprint: str):
+    return db.query(FingerprintGroup).filter(
+        FingerprintGroup.ingestion_id == ingestion_id,
+        FingerprintGroup.fingerprint == fingerprint,
+    ).first()
@@ -1,9 +1,14 @@
-from sqlalchemy import asc, func, desc
+from sqlalchemy import asc, func, desc, inspect, union_all
+from sqlalchemy.orm import aliased, undefer
 from app.models.ingestion import Ingestion
 from app.crud.projects import check_project_in_organization
 from app.models.log_event import LogEvent
 from app.models.finding import Finding
+from app.models.fingerprint_group import FingerprintGroup
+from app.crud.fingerprint_groups import get_fingerprint_group
 from app.utils.fingerprint import redact_message
+from app.utils.storage import read_record_text
+from app.utils.timestamps import as_utc
 
 def create_ingestion(db, project_id, source_type, status="pending"):
     ingestion = Ingestion(
@@ -33,102 +38,87 @@ def get_ingestions_for_project(db, project_id):
     return db.query(Ingestion).filter(Ingestion.project_id == project_id).all()
 
 def get_top_fingerprints_for_ingestion(db, ingestion_id, limit=10, offset=0):
-    subq = db.query(
-        LogEvent,
-        func.count(LogEvent.id).over(partition_by=LogEvent.fingerprint).label('fp_count'),
-        func.row_number().over(
-            partition_by=LogEvent.fingerprint, 
-            order_by=[LogEvent.seq.desc()]
-        ).label('rn')
-    ).filter(LogEvent.ingestion_id == ingestion_id).subquery()
-
-    top_errors_query = db.query(subq).filter(subq.c.rn == 1).order_by(desc(subq.c.fp_count), asc(subq.c.fingerprint)).offset(offset).limit(limit).all()
+    # reads the precomputed fingerprint_groups summary, joined to each group's latest event
+    rows = (
+        db.query(FingerprintGroup.fingerprint, FingerprintGroup.count, LogEvent)
+        .join(LogEvent, LogEvent.id == FingerprintGroup.latest_event_id)
+        .filter(FingerprintGroup.ingestion_id == ingestion_id)
+        .order_by(desc(FingerprintGroup.count), asc(FingerprintGroup.fingerprint))
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
     top_error_groups = []
-    for row in top_errors_query:
+    for fingerprint, count, latest in rows:
         top_error_groups.append({
-            "fingerprint": row.fingerprint,
-            "count": row.fp_count,
-            "latest": serialize_log(row)
+            "fingerprint": fingerprint,
+            "count": count,
+            "latest": serialize_log(latest)
         })
 
     return top_error_groups
 
-from sqlalchemy import func
-
 def get_group_overview(db, ingestion_id, fingerprint):
-    # 1. Combined Aggregates
-    stats = db.query(
-        func.count(LogEvent.id),
-        func.min(LogEvent.ts),
-        func.max(LogEvent.ts)
-    ).filter(
-        LogEvent.ingestion_id == ingestion_id, 
-        LogEvent.fingerprint == fingerprint
-    ).one()
-
-    count, first_seen, last_seen = stats
-
-    if count == 0:
+    group = get_fingerprint_group(db, ingestion_id=ingestion_id, fingerprint=fingerprint)
+    if not group:
         return None
 
-    # 2. Level & Service Distributions
-    level_counts = db.query(LogEvent.level, func.count(LogEvent.id)).filter(
-        LogEvent.ingestion_id == ingestion_id, LogEvent.fingerprint == fingerprint
-    ).group_by(LogEvent.level).all()
+    events = {
+        e.id: e for e in db.query(LogEvent).filter(
+            LogEvent.ingestion_id == ingestion_id,
+            LogEvent.id.in_([group.sample_event_id, group.latest_ts_event_id])
+        ).all()
+    }
 
-    service_counts = db.query(LogEvent.service, func.count(LogEvent.id)).filter(
-        LogEvent.ingestion_id == ingestion_id, LogEvent.fingerprint == fingerprint
-    ).group_by(LogEvent.service).all()
+    return {
+        "count": group.count,
+        "first_seen": group.first_seen,
+        "last_seen": group.last_seen,
+        "sample": events.get(group.sample_event_id),
+        "latest": events.get(group.latest_ts_event_id),
+        "level_counts": group.level_counts or {},
+        "service_counts": group.service_counts or {},
+    }
 
-    # 3. Samples (The Sample and the Latest)
-    sample = db.query(LogEvent).filter(
-        LogEvent.ingestion_id == ingestion_id, 
-        LogEvent.fingerprint == fingerprint
-    ).order_by(LogEvent.ts.desc().nullslast(), LogEvent.seq.asc()).first()
+class IngestionStatsAccumulator:
+    """Collects the overview aggregates while log events stream past during ingestion"""
 
-    latest = db.query(LogEvent).filter(
-        LogEvent.ingestion_id == ingestion_id, 
-        LogEvent.fingerprint == fingerprint
-    ).order_by(LogEvent.ts.desc().nullslast(),LogEvent.seq.desc()).first()
+    def __init__(self):
+        self.total_events = 0
+        self.total_events_with_ts = 0
+        self.min_ts = None
+        self.max_ts = None
+        self.level_counts = {}
+        self.service_counts = {}
 
-    return {
-        "count": count,
-        "first_seen": first_seen,
-        "last_seen": last_seen,
-        "sample": sample if sample else None,
-        "latest": latest if latest else None,
-        "level_counts": {l or "UNKNOWN": c for l, c in level_counts},
-        "service_counts": {s or "unknown": c for s, c in service_counts}
-    }
+    def add(self, row: dict):
+        self.total_events += 1
+        ts = row.get("ts")
+        if ts is not None:
+            ts = as_utc(ts)
+            self.total_events_with_ts += 1
+            if self.min_ts is None or ts < self.min_ts:
+                self.min_ts = ts
+            if self.max_ts is None or ts > self.max_ts:
+                self.max_ts = ts
+        level = row.get("level") or "UNKNOWN"
+        self.level_counts[level] = self.level_counts.get(level, 0) + 1
+        service = row.get("service") or "unknown"
+        self.service_counts[service] = self.service_counts.get(service, 0) + 1
 
-def get_evidence_ids_for_fingerprint(db, ingestion_id: str, fingerprint: str, head=5, tail=5):
-    head_rows = (
-        db.query(LogEvent.id)
-        .filter(LogEvent.ingestion_id == ingestion_id, LogEvent.fingerprint == fingerprint)
-        .order_by(LogEvent.seq.asc())
-        .limit(head)
-        .all()
-    )
-    tail_rows = (
-        db.query(LogEvent.id)
-        .filter(LogEvent.ingestion_id == ingestion_id, LogEvent.fingerprint == fingerprint)
-        .order_by(LogEvent.seq.desc())
-        .limit(tail)
-        .all()
-    )
-    # Dedup while preserving order-ish
-    ids = [r.id for r in head_rows] + [r.id for r in tail_rows]
-    seen = set()
-    out = []
-    for _id in ids:
-        if _id not in seen:
-            seen.add(_id)
-            out.append(_id)
-    return out
+    def build_stats(self, top_fingerprints) -> dict:
+        return {
+            "total_events": self.total_events,
+            "total_events_with_ts": self.total_events_with_ts,
+            "min_ts": self.min_ts.isoformat() if self.min_ts else None,
+            "max_ts": self.max_ts.isoformat() if self.max_ts else None,
+            "level_counts": self.level_counts,
+            "service_counts": self.service_counts,
+            "top_fingerprints": top_fingerprints,
+        }
 
-def get_ingestion_stats(db, ingestion):
-    ingestion_id = ingestion.id
+def compute_ingestion_stats(db, ingestion_id):
     # 1. Basic stats
     base_stats = db.query(
         func.count(LogEvent.id),
@@ -141,17 +131,29 @@ def get_ingestion_stats(db, ingestion):
     level_counts = db.query(LogEvent.level, func.count(LogEvent.id)).filter(LogEvent.ingestion_id == ingestion_id).group_by(LogEvent.level).all()
     service_counts = db.query(LogEvent.service, func.count(LogEvent.id)).filter(LogEvent.ingestion_id == ingestion_id).group_by(LogEvent.service).all()
 
-    # 3- We use a subquery to find the latest log per fingerprint using window functions
+    # 3- Top groups from the fingerprint_groups summary
     top_error_groups = get_top_fingerprints_for_ingestion(db, ingestion_id)
 
     return {
         "total_events": base_stats[0],
         "total_events_with_ts": base_stats[1],
-        "min_ts": base_stats[2],
-        "max_ts": base_stats[3],
+        "min_ts": base_stats[2].isoformat() if base_stats[2] else None,
+        "max_ts": base_stats[3].isoformat() if base_stats[3] else None,
         "level_counts": {l or "UNKNOWN": c for l, c in level_counts},
         "service_counts": {s or "unknown": c for s, c in service_counts},
         "top_fingerprints": top_error_groups,
+    }
+
+def get_ingestion_stats(db, ingestion):
+    stats = ingestion.stats
+    if stats is None:
+        # ingestions processed before stats were stored: compute once, keep it if the ingestion is finished
+        stats = compute_ingestion_stats(db, ingestion.id)
+        if ingestion.status == "done":
+            ingestion.stats = stats
+            db.commit()
+    return {
+        **stats,
         "findings": ingestion.findings or []
     }
 
@@ -166,15 +168,56 @@ def serialize_log(log_event, redact=None):
         "fingerprint": log_event.fingerprint,
     }
 
-def list_ingestion_events(db, ingestion_id, cursor=0, limit=100, levels=None, service=None, fingerprint=None, ts_from=None, ts_to=None, q=None):
+def get_ingestion_event(db, ingestion_id, event_id):
+    return db.query(LogEvent).options(undefer(LogEvent.raw)).filter(LogEvent.ingestion_id == ingestion_id, LogEvent.id == event_id).first()
+
+def get_event_raw(log_event):
+    """Raw record text, read from the stored ingestion file when only its byte range was saved"""
+    if log_event.raw is not None:
+        return log_event.raw
+    if log_event.raw_offset is None:
+        return None
+    try:
+        return read_record_text(str(log_event.ingestion_id), log_event.raw_offset, log_event.raw_length)
+    except FileNotFoundError:
+        return None
+
+def serialize_log_detail(log_event):
+    return {
+        **serialize_log(log_event),
+        "ts_raw": log_event.ts_raw,
+        "raw": get_event_raw(log_event),
+        "attrs": log_event.attrs,
+        "parse_kind": log_event.parse_kind,
+        "parse_confidence": float(log_event.parse_confidence) if log_event.parse_confidence is not None else None,
+    }
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def message_search_filter(q: str, mode: str = "contains"):
+    """Message search backed by the pg_trgm GIN index on log_events.message.
+
+    contains: case-insensitive substring match (ILIKE), exact results.
+    fuzzy: trigram word similarity (message %> q), tolerates typos; results stay in seq order.
+    """
+    if mode == "fuzzy":
+        return LogEvent.message.op("%>")(q)
+    return LogEvent.message.ilike(f"%{escape_like(q)}%", escape="\\")
+
+def list_ingestion_events(db, ingestion_id, cursor=0, limit=100, levels=None, service=None, fingerprint=None, ts_from=None, ts_to=None, q=None, q_mode="contains"):
     events_query = db.query(LogEvent).filter(LogEvent.ingestion_id == ingestion_id, LogEvent.seq > cursor)
+    # Each branch is a set of equality filters that one (ingestion_id, <column>, seq) index can
+    # walk in seq order. IN (...) and OR filters would break that ordering, so they are split
+    # into one branch per value and merged below.
+    branches = [[]]
     if levels is not None:
         levels_list = [x.strip().upper() for x in levels.split(",") if x.strip()]
         if levels_list:
-            events_query = events_query.filter(LogEvent.level.in_(levels_list))
+            branches = [b + [LogEvent.level == level] for b in branches for level in dict.fromkeys(levels_list)]
     if service is not None:
         if service == "unknown":
-            events_query = events_query.filter((LogEvent.service == None) | (LogEvent.service == ""))
+            branches = [b + [c] for b in branches for c in (LogEvent.service == None, LogEvent.service == "")]
         else:
             events_query = events_query.filter(LogEvent.service == service)
     if fingerprint is not None:
@@ -185,9 +228,16 @@ def list_ingestion_events(db, ingestion_id, cursor=0, limit=100, levels=None, se
         events_query = events_query.filter(LogEvent.ts <= ts_to)
     if q is not None:
         if q and q.strip():
-            events_query = events_query.filter(LogEvent.message.ilike(f"%{q}%"))
-    events = events_query.order_by(LogEvent.seq.asc()).limit(limit).all()
-    return events
+            events_query = events_query.filter(message_search_filter(q.strip(), mode=q_mode))
+    if len(branches) == 1:
+        return events_query.filter(*branches[0]).order_by(LogEvent.seq.asc()).limit(limit).all()
+    # every branch reads at most one page from its index, so deep pages stay O(limit * branches).
+    # Branches select the non-deferred columns explicitly: Query.union_all ignores deferred() and
+    # loader options, so each branch would otherwise read the raw column for every row.
+    list_columns = [attr.columns[0] for attr in inspect(LogEvent).column_attrs if not attr.deferred]
+    pages = [events_query.filter(*b).with_entities(*list_columns).order_by(LogEvent.seq.asc()).limit(limit) for b in branches]
+    merged = aliased(LogEvent, union_all(*(page.statement for page in pages)).subquery(), adapt_on_names=True)
+    return db.query(merged).order_by(merged.seq.asc()).limit(limit).all()
 
 def get_finding_details(db, finding_id, ingestion_id):
     finding = db.query(Finding).filter(Finding.id == finding_id, Finding.ingestion_id == ingestion_id).first()
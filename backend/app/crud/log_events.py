@@ -0,0 +1,110 @@
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.log_event import LogEvent
+
+# rows per COPY statement; keeps the in-memory buffer small for very large ingestions
+COPY_CHUNK_SIZE = 5000
+
+# column order used by COPY, must match the values produced by _copy_line
+COPY_COLUMNS = (
+    "id", "ingestion_id", "ts", "ts_raw", "service", "level", "seq",
+    "message", "raw", "raw_offset", "raw_length", "attrs", "parse_kind", "parse_confidence", "fingerprint",
+)
+
+def build_log_event_row(ingestion_id, seq: int, log_entry: dict, fingerprint: str, raw_span: Optional[tuple[int, int]] = None) -> dict:
+    """Map a parsed log record onto log_events column values.
+
+    With raw_span, the (byte offset, byte length) of the record in the stored ingestion
+    file is kept instead of a copy of its raw text.
+    """
+    parse = log_entry.get("parse")
+    return {
+        # generated here rather than by the database so callers know event ids before the insert
+        "id": uuid.uuid4(),
+        "ingestion_id": ingestion_id,
+        "ts": log_entry.get("ts"),
+        "ts_raw": log_entry.get("ts_raw"),
+        "service": log_entry.get("service"),
+        "level": log_entry.get("level"),
+        "seq": seq,
+        "message": log_entry.get("message", ""),
+        "fingerprint": fingerprint,
+        "raw": None if raw_span else log_entry.get("raw", ""),
+        "raw_offset": raw_span[0] if raw_span else None,
+        "raw_length": raw_span[1] if raw_span else None,
+        "attrs": log_entry.get("attrs", {}),
+        "parse_kind": parse.get("kind") if parse else None,
+        "parse_confidence": parse.get("confidence") if parse else None,
+    }
+
+def _copy_value(value) -> str:
+    # PostgreSQL COPY text format: \N is NULL, backslash and control chars are escaped
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\x00", "")
+    )
+
+def _copy_line(row: dict) -> str:
+    values = [row.get("id") or uuid.uuid4()] + [row.get(col) for col in COPY_COLUMNS[1:]]
+    return "\t".join(_copy_value(v) for v in values) + "\n"
+
+def copy_log_events(db: Session, rows, chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """Bulk load log_events rows with COPY FROM STDIN inside the session's transaction.
+
+    Rows are dicts as returned by build_log_event_row. Nothing is committed here,
+    so the (ingestion_id, seq) unique constraint is still enforced atomically by the caller's commit.
+    """
+    sql = f"COPY {LogEvent.__tablename__} ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+    cursor = db.connection().connection.cursor()
+    total = 0
+    try:
+        buf = io.StringIO()
+        pending = 0
+        for row in rows:
+            buf.write(_copy_line(row))
+            pending += 1
+            if pending >= chunk_size:
+                buf.seek(0)
+                cursor.copy_expert(sql, buf)
+                total += pending
+                buf = io.StringIO()
+                pending = 0
+        if pending:
+            buf.seek(0)
+            cursor.copy_expert(sql, buf)
+            total += pending
+    finally:
+        cursor.close()
+    return total
+
+def add_log_events(db: Session, rows, batch_size: int = COPY_CHUNK_SIZE) -> int:
+    """ORM insert path, flushing in batches"""
+    total = 0
+    events = []
+    for row in rows:
+        events.append(LogEvent(**row))
+        if len(events) >= batch_size:
+            db.add_all(events)
+            db.flush()
+            total += len(events)
+            events = []
+    db.add_all(events)
+    db.flush()
+    return total + len(events)
@@ -1,9 +1,40 @@
+import threading
+import time
+from typing import NamedTuple
+
+from app.config import settings
 from app.models.organization import Organization
 from app.models.org_member import OrganizationMember
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 
+class CachedMembership(NamedTuple):
+    org_id: str
+    user_id: str
+    role: str
+
+# (user_id, org_id) -> (expires_at, role). Only existing memberships are cached, so a new member is
+# seen immediately; the mutations below invalidate in this process and the TTL bounds other workers.
+# Because other workers can serve a stale role for up to the TTL, the cache only answers read-only
+# membership checks; admin checks and checks guarding writes always query get_membership.
+_membership_cache: dict[tuple[str, str], tuple[float, str]] = {}
+_membership_cache_lock = threading.Lock()
+
+def cache_membership(org_id, user_id, role: str):
+    with _membership_cache_lock:
+        _membership_cache[(str(user_id), str(org_id))] = (time.monotonic() + settings.membership_cache_ttl_seconds, role)
+
+def invalidate_membership(org_id, user_id=None):
+    """Forget cached memberships of one user in an org, or of every user when user_id is None"""
+    with _membership_cache_lock:
+        if user_id is not None:
+            _membership_cache.pop((str(user_id), str(org_id)), None)
+            return
+        for key in list(_membership_cache):
+            if key[1] == str(org_id):
+                _membership_cache.pop(key, None)
+
 def create_organization(db: Session, name: str):
     db_org = Organization(name=name)
     db.add(db_org)
@@ -16,6 +47,7 @@ def add_user_to_organization(db: Session, org_id: str, user_id: str, role: str =
     db.add(db_org_member)
     db.commit()
     db.refresh(db_org_member)
+    invalidate_membership(org_id, user_id)
     return db_org_member
 
 def get_membership(db: Session, org_id: str, user_id: str):
@@ -26,6 +58,19 @@ def get_membership(db: Session, org_id: str, user_id: str):
         .first()
     )
 
+def get_cached_membership(db: Session, org_id: str, user_id: str):
+    """get_membership behind the short-lived membership cache; returns something with .role or None.
+
+    For read-only endpoints only: the role may be up to membership_cache_ttl_seconds stale.
+    """
+    cached = _membership_cache.get((str(user_id), str(org_id)))
+    if cached and cached[0] > time.monotonic():
+        return CachedMembership(org_id=str(org_id), user_id=str(user_id), role=cached[1])
+    m = get_membership(db, org_id, user_id)
+    if m:
+        cache_membership(org_id, user_id, m.role)
+    return m
+
 def require_org_member(db: Session, org_id: str, user_id: str):
     m = get_membership(db, org_id, user_id)
     return m
@@ -41,6 +86,7 @@ def delete_organization(db: Session, org_id: str):
     if org:
         db.delete(org)
         db.commit()
+        invalidate_membership(org_id)
         return True
     return False
 
@@ -63,6 +109,7 @@ def add_user_to_org(db: Session, org_id: str, email: str, role: str = "member"):
     db.add(new_membership)
     db.commit()
     db.refresh(new_membership)
+    invalidate_membership(org_id, user.id)
     return new_membership
 
 def remove_user_from_org(db: Session, org_id: str, user_id: str):
@@ -70,6 +117,7 @@ def remove_user_from_org(db: Session, org_id: str, user_id: str):
     if membership:
         db.delete(membership)
         db.commit()
+        invalidate_membership(org_id, user_id)
         return True
     return False
 
@@ -79,5 +127,6 @@ def update_user_role_in_org(db: Session, org_id: str, user_id: str, new_role: st
         membership.role = new_role
         db.commit()
         db.refresh(membership)
+        invalidate_membership(org_id, user_id)
         return membership
     return None
\ No newline at end of file
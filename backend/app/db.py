@@ -1,18 +1,147 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, make_url
 
 import os
+import threading
+import time
+import uuid
 
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
+from app.utils.metrics import observe_pool_checkout, observe_pool_occupancy
 
-engine = create_engine(settings.database_url, echo=settings.debug)
+class PoolMetrics:
+    """Checkout wait time and timeouts of one engine's pool; occupancy is read from the pool itself.
+
+    The totals here back /health/db for the current process; every observation is also
+    exported to Prometheus, which aggregates across API and Celery worker processes.
+    """
+    def __init__(self, engine: str):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        observe_pool_checkout(self.engine, seconds, self.wait_seconds_max, timed_out=timed_out)
+
+class _MeasuredCheckout:
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        observe_pool_occupancy(self.metrics.engine, self)
+        return conn
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        observe_pool_occupancy(self.metrics.engine, self)
+
+class InstrumentedQueuePool(_MeasuredCheckout, QueuePool):
+    metrics = PoolMetrics("sync")
+
+class InstrumentedAsyncQueuePool(_MeasuredCheckout, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics("async")
+
+def _pool_options(pool_class) -> dict:
+    if settings.db_pgbouncer:
+        # PgBouncer owns the pooling; holding idle server connections here would only starve it
+        return {"poolclass": NullPool, "pool_pre_ping": settings.db_pool_pre_ping}
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def _connect_args(is_async: bool) -> dict:
+    args = {}
+    if is_async and settings.db_pgbouncer:
+        # transaction pooling can hand the next statement to another server connection,
+        # so asyncpg must not reuse named prepared statements
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    if settings.db_statement_timeout_ms and not settings.db_pgbouncer:
+        if is_async:
+            args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        else:
+            args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return args
+
+def _set_local_statement_timeout(sync_engine):
+    # PgBouncer rejects startup options, so the timeout is applied per transaction instead
+    @event.listens_for(sync_engine, "begin")
+    def set_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}")
+
+engine = create_engine(settings.database_url, echo=settings.debug, connect_args=_connect_args(False), **_pool_options(InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL if set, otherwise DATABASE_URL with the asyncpg driver"""
+    if settings.async_database_url:
+        return settings.async_database_url
+    return make_url(settings.database_url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# read-heavy API endpoints run on this engine so a request waiting on Postgres doesn't pin a threadpool thread
+async_engine = create_async_engine(get_async_database_url(), echo=settings.debug, connect_args=_connect_args(True), **_pool_options(InstrumentedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if settings.db_pgbouncer and settings.db_statement_timeout_ms:
+    _set_local_statement_timeout(engine)
+    _set_local_statement_timeout(async_engine.sync_engine)
+
+def dispose_engines_after_fork():
+    """Drop connections inherited from the parent process without closing them under the parent's feet"""
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+def get_pool_stats() -> dict:
+    """Occupancy and checkout wait metrics of the sync and async engine pools in this process"""
+    stats = {}
+    for name, pool, metrics in (
+        ("sync", engine.pool, InstrumentedQueuePool.metrics),
+        ("async", async_engine.sync_engine.pool, InstrumentedAsyncQueuePool.metrics),
+    ):
+        stats[name] = {
+            "pool": type(pool).__name__,
+            "size": pool.size() if isinstance(pool, QueuePool) else 0,
+            "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else None,
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else None,
+            "max_overflow": settings.db_max_overflow if isinstance(pool, QueuePool) else None,
+            "checkouts": metrics.checkouts,
+            "checkout_timeouts": metrics.timeouts,
+            "checkout_wait_seconds_total": round(metrics.wait_seconds_total, 6),
+            "checkout_wait_seconds_max": round(metrics.wait_seconds_max, 6),
+        }
+    return stats
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,34 +1,98 @@
+from typing import NamedTuple
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.security.jwt import decode_access_token
 from app.security.rate_limit import limiter
 from app.models.user import User
+from app.models.org_member import OrganizationMember
+from app.models.project import Project
+from app.models.ingestion import Ingestion
+from app.crud.organizations import cache_membership
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get the current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_user_id(token: str) -> str:
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user_id
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Get the current authenticated user from JWT token."""
+    credentials_exception = _credentials_exception()
+    user_id = _token_user_id(token)
     user = db.query(User).filter(User.id == str(user_id)).first()
     if user is None:
         raise credentials_exception
     return user
 
 
+class IngestionScope(NamedTuple):
+    user: User
+    ingestion: Ingestion
+
+
+def get_ingestion_scope(org_id: str, project_id: str, ingestion_id: str, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> IngestionScope:
+    """Authenticate and authorize an ingestion-scoped request in one query.
+
+    Resolves the token's user, their membership in org_id, the project in that org and the
+    ingestion in that project with a single joined SELECT, raising the same 401/403/404 as
+    get_current_user + require_org_member + get_ingestion_scoped did.
+    """
+    user_id = _token_user_id(token)
+    row = db.execute(_ingestion_scope_statement(user_id, org_id, project_id, ingestion_id)).first()
+    return _resolve_ingestion_scope(row, org_id)
+
+
+async def get_ingestion_scope_async(org_id: str, project_id: str, ingestion_id: str, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> IngestionScope:
+    """get_ingestion_scope for endpoints running on the async engine"""
+    user_id = _token_user_id(token)
+    row = (await db.execute(_ingestion_scope_statement(user_id, org_id, project_id, ingestion_id))).first()
+    return _resolve_ingestion_scope(row, org_id)
+
+
+def _ingestion_scope_statement(user_id, org_id, project_id, ingestion_id):
+    return (
+        select(User, OrganizationMember.role, Ingestion)
+        .outerjoin(OrganizationMember, and_(OrganizationMember.user_id == User.id, OrganizationMember.org_id == org_id))
+        .outerjoin(Project, and_(Project.id == project_id, Project.org_id == org_id))
+        .outerjoin(Ingestion, and_(Ingestion.id == ingestion_id, Ingestion.project_id == Project.id))
+        .where(User.id == str(user_id))
+        .limit(1)
+    )
+
+
+def _resolve_ingestion_scope(row, org_id) -> IngestionScope:
+    if row is None:
+        raise _credentials_exception()
+    user, role, ingestion = row
+    if role is None:
+        raise HTTPException(status_code=403, detail="Not a member of this organization")
+    cache_membership(org_id, user.id, role)
+    if ingestion is None:
+        raise HTTPException(status_code=404, detail="Ingestion not found in this project and organization")
+    return IngestionScope(user=user, ingestion=ingestion)
+
+
 def verify_request_headers(request: Request):
     """Verify that required security headers are present."""
     # Additional security validation can be added here
@@ -6,7 +6,10 @@ from slowapi.errors import RateLimitExceeded
 from app.api.v1.api import api_router
 from app.config import settings
 from app.security.rate_limit import limiter
-from app.security.headers import SecurityHeadersMiddleware, RequestTimeoutMiddleware
+from app.security.headers import BodySizeLimitMiddleware, SecurityHeadersMiddleware, RequestTimeoutMiddleware
+from app.utils.ingestion_cache import get_cache_stats
+from app.utils.metrics import CacheStatsCollector, MetricsMiddleware, build_registry, metrics_response
+from app.db import get_pool_stats
 
 app = FastAPI(title="AI-Ops Assistant", version="0.1.0")
 
@@ -19,10 +22,16 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # 1. Security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
 
+# 2. Request latency metrics
+app.add_middleware(MetricsMiddleware)
+
 # 3. Request timeout tracking middleware
 app.add_middleware(RequestTimeoutMiddleware, timeout_seconds=settings.request_timeout_seconds)
 
-# 4. CORS middleware - should be last
+# 4. Request body size limit - rejects oversized uploads before they are parsed
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.max_body_size)
+
+# 5. CORS middleware - should be last
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -33,8 +42,27 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
+metrics_registry = build_registry([CacheStatsCollector()])
+
 
 @app.get("/health")
 @limiter.limit("60/minute")
 async def health_check(request: Request):
     return {"status": "ok", "version": "0.1.0"}
+
+
+@app.get("/health/cache")
+@limiter.limit("60/minute")
+def cache_stats(request: Request):
+    return {"ingestion_cache": get_cache_stats()}
+
+
+@app.get("/health/db")
+@limiter.limit("60/minute")
+def db_pool_stats(request: Request):
+    return {"db_pools": get_pool_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    return metrics_response(metrics_registry)
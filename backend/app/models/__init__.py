@@ -5,4 +5,5 @@ from .project import Project
 from .ai_analysis import AiAnalysis
 from .finding import Finding
 from .ingestion import Ingestion
-from .log_event import LogEvent
\ No newline at end of file
+from .log_event import LogEvent
+from .fingerprint_group import FingerprintGroup
\ No newline at end of file
@@ -15,7 +15,10 @@ class AiAnalysis(Base):
     scope_type = Column(String, nullable=False)  # "group" or "finding"
     scope_id = Column(String, nullable=False)  # fingerprint for group, finding_id for
     result = Column(Text, nullable=True, default={})
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
     ingestion = relationship('Ingestion', back_populates='ai_analyses')
     __table_args__ = (
@@ -0,0 +1,32 @@
+import uuid
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+class FingerprintGroup(Base):
+    """Per-fingerprint summary of an ingestion, written once when the ingestion is processed"""
+    __tablename__ = "fingerprint_groups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    ingestion_id = Column(UUID(as_uuid=True), ForeignKey("ingestions.id", ondelete="CASCADE"), nullable=False)
+    fingerprint = Column(String, nullable=False)
+
+    count = Column(Integer, nullable=False)
+    first_seen = Column(DateTime(timezone=True), nullable=True)
+    last_seen = Column(DateTime(timezone=True), nullable=True)
+    latest_event_id = Column(UUID(as_uuid=True), nullable=False)  # highest seq
+    sample_event_id = Column(UUID(as_uuid=True), nullable=False)  # newest ts, lowest seq
+    latest_ts_event_id = Column(UUID(as_uuid=True), nullable=False)  # newest ts, highest seq
+    level_counts = Column(JSONB, nullable=False, default={})
+    service_counts = Column(JSONB, nullable=False, default={})
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    ingestion = relationship("Ingestion", back_populates="fingerprint_groups")
+    __table_args__ = (
+        UniqueConstraint("ingestion_id", "fingerprint", name="uq_fingerprint_groups_ingestion_id_fingerprint"),
+        Index("ix_fingerprint_groups_ingestion_id_count", "ingestion_id", count.desc(), "fingerprint"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy import Column, ForeignKey, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -14,9 +14,11 @@ class Ingestion(Base):
     source_type = Column(String, nullable=False)  # later: CHECK constraint
     status = Column(String, nullable=False, default="pending")  # later: CHECK constraint
     finding_status = Column(String, nullable=False, default="pending")  # pending, processing, done, failed
+    stats = Column(JSONB, nullable=True)  # overview aggregates, computed once when processing finishes
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     project = relationship("Project", back_populates="ingestions")
     log_events = relationship("LogEvent", back_populates="ingestion", cascade="all, delete-orphan", passive_deletes=True,)
     findings = relationship("Finding", back_populates="ingestion", cascade="all, delete-orphan", passive_deletes=True,)
     ai_analyses = relationship("AiAnalysis", back_populates="ingestion", cascade="all, delete-orphan", passive_deletes=True,)
+    fingerprint_groups = relationship("FingerprintGroup", back_populates="ingestion", cascade="all, delete-orphan", passive_deletes=True,)
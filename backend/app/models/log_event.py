@@ -1,7 +1,7 @@
 import uuid
-from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, Numeric, String, DateTime, Text, UniqueConstraint
+from sqlalchemy import JSON, BigInteger, Column, ForeignKey, Index, Integer, Numeric, String, DateTime, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from app.db import Base
@@ -19,7 +19,11 @@ class LogEvent(Base):
     seq = Column(Integer, nullable=False)
 
     message = Column(Text, nullable=False)
-    raw = Column(Text, nullable=False)
+    # raw text is either stored inline or, when null, located by byte range in the stored ingestion file;
+    # deferred so list queries never load it
+    raw = deferred(Column(Text, nullable=True))
+    raw_offset = Column(BigInteger, nullable=True)
+    raw_length = Column(Integer, nullable=True)
     attrs = Column(JSON, nullable=True)
     parse_kind = Column(String, nullable=True)
     parse_confidence = Column(Numeric(precision=3, scale=2), nullable=True) # Decimal from 0 to 1 indicating confidence in parsing
@@ -32,6 +36,11 @@ class LogEvent(Base):
         UniqueConstraint("ingestion_id", "seq", name="uq_log_events_ingestion_id_seq"),
         Index("ix_log_events_ingestion_id_seq", "ingestion_id", "seq"),
         Index("ix_log_events_ingestion_id_ts", "ingestion_id", "ts"),
-        Index("ix_log_events_ingestion_id_fingerprint", "ingestion_id", "fingerprint"),
+        # filtered /events pages walk these in seq order instead of scanning the seq index
+        Index("ix_log_events_ingestion_id_fingerprint_seq", "ingestion_id", "fingerprint", "seq"),
+        Index("ix_log_events_ingestion_id_level_seq", "ingestion_id", "level", "seq"),
+        Index("ix_log_events_ingestion_id_service_seq", "ingestion_id", "service", "seq"),
+        # pg_trgm index backing ILIKE '%q%' and word-similarity search on messages
+        Index("ix_log_events_message_trgm", "message", postgresql_using="gin", postgresql_ops={"message": "gin_trgm_ops"}),
     )
 
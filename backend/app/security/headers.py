@@ -1,8 +1,9 @@
 """Security headers and middleware utilities."""
-from fastapi import Request
-from fastapi.responses import Response
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 import time
 
 
@@ -52,3 +53,58 @@ class RequestTimeoutMiddleware(BaseHTTPMiddleware):
         response.headers["X-Process-Time"] = str(process_time)
 
         return response
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies larger than max_body_size before they are parsed or spooled to disk.
+
+    A declared Content-Length over the limit is answered with 413 without reading the body;
+    otherwise the body is counted as it is received and reading stops once it passes the limit,
+    so an oversized multipart upload is cut off instead of being written to a temp file in full.
+    Pure ASGI rather than BaseHTTPMiddleware so it sees the body as it streams in.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(status_code=413, detail=f"Request body exceeds the {self.max_body_size} byte limit")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            error = self._too_large()
+            await JSONResponse({"detail": error.detail}, status_code=error.status_code)(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so the route answers 413
+                    raise self._too_large()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as error:
+            # raised while something outside a route was reading the body
+            if error.status_code != 413 or response_started:
+                raise
+            await JSONResponse({"detail": error.detail}, status_code=error.status_code)(scope, receive, send)
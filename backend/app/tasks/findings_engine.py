@@ -1,79 +1,64 @@
+from collections import deque
+
 from app.utils.findings_rules import apply_generic_error_rules, apply_rules_to_message
-from app.crud.ingestions import get_top_fingerprints_for_ingestion, get_evidence_ids_for_fingerprint
-from app.db import SessionLocal
-from app.models.log_event import LogEvent
-from app.celery_worker import celery
 from app.models.finding import Finding
-from app.models.ingestion import Ingestion
 
 
 MAX_EVIDENCE_PER_RULE = 12
 MAX_FPS_PER_RULE_IN_SUMMARY = 10
-
-@celery.task
-def analyze_logs_for_findings(ingestion_id: str):
-    db = SessionLocal()
-    try:
-        ingestion = db.query(Ingestion).filter(Ingestion.id == ingestion_id).first()
-        if not ingestion:
-            return
-        ingestion.finding_status = "processing"
-        db.commit()
-        # Pass 1 - get top fingerprints for ingestion and apply rules to their latest message
-        fingerprints_finding = run_rules_test_on_groups(db, ingestion_id)
-        # Pass 2 - run rules against error events directly to catch any matches that might not be top volume but still important
-        errors_finding = run_rules_test_on_errors(db, ingestion_id, findings_by_rule=fingerprints_finding)
-        # finalize formatting (sort fingerprints, drop internal helper)
-        findings = list(errors_finding.values())
-        for f in findings:
-            f["matched_fingerprints"].sort(key=lambda x: x["count"], reverse=True)
-            f["matched_fingerprints"] = f["matched_fingerprints"][:MAX_FPS_PER_RULE_IN_SUMMARY]
-            f.pop("_evidence_set", None)
-            f.pop("_fps_set", None)
-
-        # sort findings by severity then volume
-        sev_rank = {"CRIT": 4, "HIGH": 3, "MED": 2, "LOW": 1}
-        findings.sort(key=lambda x: (sev_rank.get(x["severity"], 0), x["total_occurrences"]), reverse=True)
-        # Delete old findings for this ingestion
-        db.query(Finding).filter(Finding.ingestion_id == ingestion_id).delete()
-        # Insert new findings into the database
-        findings_db = []
-        for f in findings:
-            finding = Finding(
-                ingestion_id=ingestion_id,
-                rule_id=f["rule_id"],
-                title=f["title"],
-                severity=f["severity"],
-                confidence=f["confidence"],
-                total_occurrences=f["total_occurrences"],
-                matched_fingerprints=f["matched_fingerprints"],
-                evidence_event_ids=f["evidence_event_ids"],
-            )
-            findings_db.append(finding)
-        db.add_all(findings_db)
-        ingestion.finding_status = "done"
-        db.commit()
-    except Exception as e:
-        if ingestion:
-            ingestion.finding_status = "failed"
-            db.commit()
-        raise e
-    finally:
-        db.close()
-
-def run_rules_test_on_errors(db, ingestion_id: str, findings_by_rule=None):
+MAX_GROUPS_TO_SCAN = 200
+MAX_ERRORS_TO_SCAN = 5000
+EVIDENCE_HEAD = 5
+EVIDENCE_TAIL = 5
+ERROR_LEVELS = ("ERROR", "CRITICAL", "FATAL")
+
+def finalize_findings(findings_by_rule: dict) -> list[dict]:
+    # finalize formatting (sort fingerprints, drop internal helper)
+    findings = list(findings_by_rule.values())
+    for f in findings:
+        f["matched_fingerprints"].sort(key=lambda x: x["count"], reverse=True)
+        f["matched_fingerprints"] = f["matched_fingerprints"][:MAX_FPS_PER_RULE_IN_SUMMARY]
+        f.pop("_evidence_set", None)
+        f.pop("_fps_set", None)
+
+    # sort findings by severity then volume
+    sev_rank = {"CRIT": 4, "HIGH": 3, "MED": 2, "LOW": 1}
+    findings.sort(key=lambda x: (sev_rank.get(x["severity"], 0), x["total_occurrences"]), reverse=True)
+    return findings
+
+def save_findings(db, ingestion_id, findings: list[dict]):
+    """Replace the findings of an ingestion; the caller commits"""
+    # Delete old findings for this ingestion
+    db.query(Finding).filter(Finding.ingestion_id == ingestion_id).delete()
+    # Insert new findings into the database
+    findings_db = []
+    for f in findings:
+        finding = Finding(
+            ingestion_id=ingestion_id,
+            rule_id=f["rule_id"],
+            title=f["title"],
+            severity=f["severity"],
+            confidence=f["confidence"],
+            total_occurrences=f["total_occurrences"],
+            matched_fingerprints=f["matched_fingerprints"],
+            evidence_event_ids=f["evidence_event_ids"],
+        )
+        findings_db.append(finding)
+    db.add_all(findings_db)
+
+def collect_error_findings(errors, findings_by_rule=None):
+    """Apply rules to error events, newest first. errors yields (id, fingerprint, level, message)"""
     if findings_by_rule is None:
         findings_by_rule = {}
-    errors = db.query(LogEvent).filter(LogEvent.ingestion_id == ingestion_id, LogEvent.level.in_(["ERROR", "CRITICAL", "FATAL"])).order_by(LogEvent.seq.desc()).limit(5000).all()
-    for error in errors:
-        matches = apply_rules_to_message(error.message)
+    for error_id, error_fingerprint, error_level, error_message in errors:
+        matches = apply_rules_to_message(error_message)
         if not matches:
             # heuristic: if no rules match, check more generic errors
-            if apply_generic_error_rules(error.message):
+            if apply_generic_error_rules(error_message):
                 matches.append({
                     "rule_id": "generic_error",
                     "title": "Generic error pattern match",
-                    "severity": "CRIT" if error.level in ["CRITICAL", "FATAL"] else "HIGH",
+                    "severity": "CRIT" if error_level in ["CRITICAL", "FATAL"] else "HIGH",
                     "confidence": 0.5,
                 })
             else:
@@ -87,40 +72,35 @@ def run_rules_test_on_errors(db, ingestion_id: str, findings_by_rule=None):
                     "severity": m["severity"],
                     "confidence": m["confidence"],
                     "total_occurrences": 1,
-                    "matched_fingerprints": [{"fingerprint": error.fingerprint, "count": 1}],
-                    "evidence_event_ids": [str(error.id)],
-                    "_evidence_set": {error.id},  # internal helper for dedup
-                    "_fps_set": {error.fingerprint},  # internal helper to track which fps we've added for this rule
+                    "matched_fingerprints": [{"fingerprint": error_fingerprint, "count": 1}],
+                    "evidence_event_ids": [str(error_id)],
+                    "_evidence_set": {error_id},  # internal helper for dedup
+                    "_fps_set": {error_fingerprint},  # internal helper to track which fps we've added for this rule
                 }
             else:
                 f = findings_by_rule[rid]
-                if len(f["matched_fingerprints"]) < MAX_FPS_PER_RULE_IN_SUMMARY and error.fingerprint not in f["_fps_set"]:
-                    f["matched_fingerprints"].append({"fingerprint": error.fingerprint, "count": 1})
-                    f["_fps_set"].add(error.fingerprint)
-                if len(f["evidence_event_ids"]) < MAX_EVIDENCE_PER_RULE and error.id not in f["_evidence_set"]:
-                    f["evidence_event_ids"].append(str(error.id))
-                    f["_evidence_set"].add(error.id)
+                if len(f["matched_fingerprints"]) < MAX_FPS_PER_RULE_IN_SUMMARY and error_fingerprint not in f["_fps_set"]:
+                    f["matched_fingerprints"].append({"fingerprint": error_fingerprint, "count": 1})
+                    f["_fps_set"].add(error_fingerprint)
+                if len(f["evidence_event_ids"]) < MAX_EVIDENCE_PER_RULE and error_id not in f["_evidence_set"]:
+                    f["evidence_event_ids"].append(str(error_id))
+                    f["_evidence_set"].add(error_id)
                 f["total_occurrences"] += 1
-                
-    return findings_by_rule
 
-def run_rules_test_on_groups(db, ingestion_id: str, limit_fps: int = 100):
-    # Find top fingerprints for the ingestion
-    groups = get_top_fingerprints_for_ingestion(db, ingestion_id=ingestion_id, limit=200)  # limit to top 200 groups to keep processing time reasonable
-    findings_by_rule = {}
+    return findings_by_rule
 
-    for g in groups:
-        fp = g["fingerprint"]
-        count = int(g["count"])
-        latest = g["latest"]  # likely dict from serialize_log
-        msg = latest.get("message", "")
+def collect_group_findings(groups, get_evidence_ids, findings_by_rule=None):
+    """Apply rules to the latest message of each group. groups yields (fingerprint, count, latest_message)"""
+    if findings_by_rule is None:
+        findings_by_rule = {}
 
+    for fp, count, msg in groups:
         matches = apply_rules_to_message(msg)
         if not matches:
             continue
 
         # fetch evidence once per fingerprint (even if multiple rules match)
-        evidence_ids = get_evidence_ids_for_fingerprint(db, ingestion_id, fp, head=5, tail=5)
+        evidence_ids = get_evidence_ids(fp)
 
         for m in matches:
             rid = m["rule_id"]
@@ -155,3 +135,45 @@ def run_rules_test_on_groups(db, ingestion_id: str, limit_fps: int = 100):
 
     return findings_by_rule
 
+class FindingsAccumulator:
+    """Tracks what the findings passes need while rows are being ingested.
+
+    Keeps per-fingerprint counts, the latest message and head/tail evidence ids, plus the
+    newest MAX_ERRORS_TO_SCAN error events, so findings can be computed at the end of
+    ingestion without reading log_events back. Rows must be added in seq order.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.errors = deque(maxlen=MAX_ERRORS_TO_SCAN)
+
+    def add(self, row: dict):
+        fp = row["fingerprint"]
+        group = self.groups.get(fp)
+        if group is None:
+            group = self.groups[fp] = {"count": 0, "message": "", "head": [], "tail": deque(maxlen=EVIDENCE_TAIL)}
+        group["count"] += 1
+        group["message"] = row["message"]
+        if len(group["head"]) < EVIDENCE_HEAD:
+            group["head"].append(row["id"])
+        group["tail"].append(row["id"])
+        if row["level"] in ERROR_LEVELS:
+            self.errors.append((row["id"], fp, row["level"], row["message"]))
+
+    def _evidence_ids(self, fp):
+        # head ascending, then tail descending, deduped
+        group = self.groups[fp]
+        out = []
+        for _id in group["head"] + list(reversed(group["tail"])):
+            if _id not in out:
+                out.append(_id)
+        return out
+
+    def build_findings(self) -> list[dict]:
+        top = sorted(self.groups.items(), key=lambda item: (-item[1]["count"], item[0]))[:MAX_GROUPS_TO_SCAN]
+        findings_by_rule = collect_group_findings(
+            ((fp, g["count"], g["message"]) for fp, g in top),
+            get_evidence_ids=self._evidence_ids,
+        )
+        findings_by_rule = collect_error_findings(reversed(self.errors), findings_by_rule=findings_by_rule)
+        return finalize_findings(findings_by_rule)
@@ -1,49 +1,96 @@
 from app.celery_worker import celery
+from app.config import settings
 from app.db import SessionLocal
 from app.models.ingestion import Ingestion
-from app.utils.storage import read_ingestion_text
-from app.models.log_event import LogEvent
+from app.utils.storage import IngestionLineReader, get_ingestion_size, iter_ingestion_lines
 from app.utils.fingerprint import make_fingerprint
-from app.utils.log_parser import parse_logs
-from app.tasks.findings_engine import analyze_logs_for_findings
+from app.utils.log_parser import iter_parsed_logs
+from app.utils.parallel_parser import iter_parsed_logs_parallel
+from app.crud.log_events import build_log_event_row, copy_log_events, add_log_events
+from app.crud.fingerprint_groups import FingerprintGroupAccumulator, save_fingerprint_groups
+from app.crud.ingestions import IngestionStatsAccumulator, get_top_fingerprints_for_ingestion
+from app.tasks.findings_engine import FindingsAccumulator, save_findings
+from app.utils.ingestion_cache import invalidate_ingestion_cache
+from app.utils.metrics import INGESTIONS, StageTimer, observe_ingestion
+
+# number of parsed records held in memory before they are written to the database
+INGEST_BATCH_SIZE = 5000
+
+def iter_log_event_rows(ingestion_id, log_entries, accumulators=(), line_reader=None, timer=None):
+    for seq, log_entry in enumerate(log_entries, start=1):
+        # the parallel parser fingerprints inside the pool processes
+        fingerprint = log_entry.get("fingerprint")
+        if not fingerprint:
+            if timer:
+                timer.start("fingerprint")
+            fingerprint = make_fingerprint(log_entry.get("signature"))
+            if timer:
+                timer.stop()
+        # with a line reader, raw text stays in the stored file and only its byte range is saved
+        raw_span = line_reader.claim_record(log_entry["raw"]) if line_reader else None
+        row = build_log_event_row(ingestion_id, seq, log_entry, fingerprint, raw_span=raw_span)
+        for accumulator in accumulators:
+            accumulator.add(row)
+        yield row
 
 @celery.task
 def process_ingestion(ingestion_id: str):
     db = SessionLocal()
+    timer = StageTimer("process_ingestion")
     ingestion = db.query(Ingestion).filter(Ingestion.id == ingestion_id).first()
     try:
         if not ingestion:
             return
         ingestion.status = "processing"
+        ingestion.finding_status = "processing"
         db.commit()
-        logs = read_ingestion_text(ingestion_id)
-        parsed_logs = parse_logs(logs)
-        events = []
-        for seq, log_entry in enumerate(parsed_logs, start=1):
-            fingerprint = make_fingerprint(log_entry.get("signature"))
-            log_event = LogEvent(
-                ingestion_id=ingestion.id,
-                ts=log_entry.get("ts"),
-                ts_raw=log_entry.get("ts_raw"),
-                service=log_entry.get("service"),
-                level=log_entry.get("level"),
-                seq=seq,
-                message=log_entry.get("message", ""),
-                fingerprint=fingerprint,
-                raw=log_entry.get("raw", ""),
-                attrs=log_entry.get("attrs", {}),
-                parse_kind=log_entry.get("parse").get("kind") if log_entry.get("parse") else None,
-                parse_confidence=log_entry.get("parse").get("confidence") if log_entry.get("parse") else None,
-            )
-            events.append(log_event)
-        db.add_all(events)
-        db.commit()
+        # stream the stored file through the parser so memory is bounded by one batch, not the upload size;
+        # the stages below interleave per record, so the timer charges each one only for its own share
+        line_reader = None if settings.ingest_store_raw else IngestionLineReader(ingestion_id)
+        lines = timer.iter(line_reader if line_reader else iter_ingestion_lines(ingestion_id), "read")
+        size = get_ingestion_size(ingestion_id)
+        workers = settings.ingest_parse_workers
+        if workers > 1 and size >= settings.ingest_parallel_min_bytes:
+            parsed_logs = iter_parsed_logs_parallel(lines, workers=workers)
+        else:
+            parsed_logs = iter_parsed_logs(lines)
+        # findings and group summaries are accumulated while rows stream past, so log_events never has to be read back
+        findings = FindingsAccumulator()
+        groups = FingerprintGroupAccumulator()
+        stats = IngestionStatsAccumulator()
+        rows = iter_log_event_rows(
+            ingestion.id, timer.iter(parsed_logs, "parse"),
+            accumulators=(findings, groups, stats), line_reader=line_reader, timer=timer,
+        )
+        rows = timer.iter(rows, "build_rows")
+        # rows are written in chunks but committed once, so the whole ingestion lands in one transaction
+        with timer.stage("db_insert"):
+            if settings.ingest_use_copy:
+                records = copy_log_events(db, rows, chunk_size=INGEST_BATCH_SIZE)
+            else:
+                records = add_log_events(db, rows, batch_size=INGEST_BATCH_SIZE)
+        with timer.stage("rules"):
+            finding_list = findings.build_findings()
+        with timer.stage("save_aggregates"):
+            save_fingerprint_groups(db, ingestion.id, groups.groups.values())
+            save_findings(db, ingestion.id, finding_list)
+            # the overview endpoint serves these stored aggregates instead of scanning log_events
+            ingestion.stats = stats.build_stats(get_top_fingerprints_for_ingestion(db, ingestion.id))
         ingestion.status = "done"
-        db.commit()
-        analyze_logs_for_findings.delay(ingestion_id)
+        ingestion.finding_status = "done"
+        with timer.stage("commit"):
+            db.commit()
+        # drop responses a reader may have cached from the previous run while this one was queued
+        invalidate_ingestion_cache(ingestion.id)
+        observe_ingestion(timer, size, records)
+        INGESTIONS.labels(task="process_ingestion", status="done").inc()
     except Exception as e:
+        # discard any partially written batches before recording the failure
+        db.rollback()
         ingestion.status = "failed"
+        ingestion.finding_status = "failed"
         db.commit()
+        INGESTIONS.labels(task="process_ingestion", status="failed").inc()
         raise e
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
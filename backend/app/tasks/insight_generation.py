@@ -0,0 +1,54 @@
+from app.celery_worker import celery
+from app.crud.ingestions import create_insights_data
+from app.db import SessionLocal
+from app.models.ai_analysis import AiAnalysis
+from app.models.ingestion import Ingestion
+from app.utils.ai_insights import stream_insights
+from app.utils.ingestion_cache import invalidate_ingestion_cache
+from app.utils.insight_stream import publish_insight_delta, publish_insight_end
+
+@celery.task
+def generate_insight(analysis_id: str):
+    db = SessionLocal()
+    analysis = db.query(AiAnalysis).filter(AiAnalysis.id == analysis_id).first()
+    try:
+        if not analysis:
+            return
+        analysis.status = "running"
+        db.commit()
+        ingestion = db.query(Ingestion).filter(Ingestion.id == analysis.ingestion_id).first()
+        insight_data, error = create_insights_data(
+            db, analysis.scope_type, ingestion,
+            fingerprint=analysis.scope_id if analysis.scope_type == "group" else None,
+            finding_id=analysis.scope_id if analysis.scope_type == "finding" else None,
+        )
+        if not insight_data:
+            analysis.status = "failed"
+            analysis.error = error
+            db.commit()
+            publish_insight_end(analysis_id, "failed", error=error)
+            return
+        # end the read transaction so no pooled connection is held across the LLM round trip
+        db.commit()
+        # SSE clients of this job see each piece as soon as the model produces it
+        parts = []
+        for delta in stream_insights(insight_data):
+            parts.append(delta)
+            publish_insight_delta(analysis_id, delta)
+        result = "".join(parts).strip()
+        analysis.result = result
+        analysis.status = "done"
+        analysis.error = None
+        db.commit()
+        # finding and group details embed the stored insight
+        invalidate_ingestion_cache(analysis.ingestion_id)
+        publish_insight_end(analysis_id, "done", insight=result)
+    except Exception as e:
+        db.rollback()
+        analysis.status = "failed"
+        analysis.error = "Insight generation failed"
+        db.commit()
+        publish_insight_end(analysis_id, "failed", error=analysis.error)
+        raise e
+    finally:
+        db.close()
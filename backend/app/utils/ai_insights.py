@@ -1,6 +1,12 @@
 import json
+from typing import Iterator
 
-from app.utils.groq_client import chat_completion
+from app.config import settings
+from app.utils.groq_client import stream_chat_completion
+from app.utils.insight_cache import get_cached_insight, insight_cache_key, store_insight
+from app.utils.metrics import INSIGHT_CACHE_LOOKUPS
+
+INSIGHT_TEMPERATURE = 0.2
 
 SYSTEM_PROMPT = """You are a production incident analysis assistant.
 
@@ -106,7 +112,22 @@ Evidence citing rules:
 
     raise ValueError(f"Unknown insight_data['type']: {insight_data.get('type')}")
 
-def generate_insights(insight_data: dict):
+def stream_insights(insight_data: dict) -> Iterator[str]:
+    """Insight for insight_data, yielded in pieces as the model produces it.
+
+    A cached completion is yielded whole; a streamed one is cached once it is complete.
+    """
     messages = generate_prompt(insight_data)
-    result = chat_completion(messages)
-    return result
+    # the context is redacted, so identical incidents produce byte-identical prompts
+    key = insight_cache_key(messages, settings.groq_llm_model, INSIGHT_TEMPERATURE)
+    cached = get_cached_insight(key)
+    if cached is not None:
+        INSIGHT_CACHE_LOOKUPS.labels(outcome="hit").inc()
+        yield cached
+        return
+    INSIGHT_CACHE_LOOKUPS.labels(outcome="miss").inc()
+    parts = []
+    for delta in stream_chat_completion(messages, temperature=INSIGHT_TEMPERATURE):
+        parts.append(delta)
+        yield delta
+    store_insight(key, "".join(parts).strip())
@@ -158,19 +158,29 @@ GENERIC_ERROR_RULES = [
     r"\bdata loss\b",
 ]
 
+def _union(patterns):
+    # a single alternation matches somewhere iff one of its branches does, so one search replaces an any() loop
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
 COMPILED_GENERIC_ERROR_RULES = [re.compile(p, re.IGNORECASE) for p in GENERIC_ERROR_RULES]
+GENERIC_ERROR_PATTERN = _union(GENERIC_ERROR_RULES)
 
 # Optional: compile once (handy for the task)
 COMPILED_RULES = [
-    {**r, "patterns": [re.compile(p, re.IGNORECASE) for p in r["regex"]]}
+    {**r, "patterns": [re.compile(p, re.IGNORECASE) for p in r["regex"]], "pattern": _union(r["regex"])}
     for r in RULES
 ]
 
+# Prefilter over every rule pattern: most messages match nothing and are rejected in one scan
+ANY_RULE_PATTERN = _union([p for r in RULES for p in r["regex"]])
+
 def apply_rules_to_message(message: str):
     message = message or ""
     matches = []
+    if not ANY_RULE_PATTERN.search(message):
+        return matches
     for rule in COMPILED_RULES:
-        if any(p.search(message) for p in rule["patterns"]):
+        if rule["pattern"].search(message):
             matches.append({
                 "rule_id": rule["id"],
                 "title": rule["title"],
@@ -181,4 +191,4 @@ def apply_rules_to_message(message: str):
 
 def apply_generic_error_rules(message: str):
     message = message or ""
-    return any(p.search(message) for p in COMPILED_GENERIC_ERROR_RULES)
\ No newline at end of file
+    return GENERIC_ERROR_PATTERN.search(message) is not None
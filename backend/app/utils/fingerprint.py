@@ -1,5 +1,6 @@
 import hashlib
 import re
+from functools import lru_cache
 
 UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
 IP_PATTERN = r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b"
@@ -9,6 +10,31 @@ EMAIL_PATTERN = r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b"
 URL_PATTERN = r"\bhttps?://[^\s]+\b"
 TOKEN_PATTERN = r"\b[a-zA-Z0-9]{20,}\b"
 
+# Placeholder classes in the order the old chain of re.sub calls applied them. Alternation tries
+# branches left to right, so at any position the earlier class still wins.
+_FINGERPRINT_CLASSES = [
+    ("uuid", UUID_PATTERN, "<uuid>"),
+    ("ip", IP_PATTERN, "<ip>"),
+    ("hex", HEX_PATTERN, "<hex>"),
+    ("email", EMAIL_PATTERN, "<email>"),
+    ("url", URL_PATTERN, "<url>"),
+    ("token", TOKEN_PATTERN, "<token>"),
+    ("timestamp", TIMESTAMP_PATTERN, "<timestamp>"),
+    ("number", r"\b\d{4,}\b", "<number>"),
+    ("ws", r"\s+", " "),
+]
+_REDACT_CLASSES = [c for c in _FINGERPRINT_CLASSES if c[0] not in ("timestamp", "number")]
+
+def _compile_classes(classes):
+    pattern = re.compile("|".join(f"(?P<{name}>{regex})" for name, regex, _ in classes))
+    replacements = {name: placeholder for name, _, placeholder in classes}
+    return pattern, (lambda m: replacements[m.lastgroup])
+
+FINGERPRINT_RE, _fingerprint_repl = _compile_classes(_FINGERPRINT_CLASSES)
+REDACT_RE, _redact_repl = _compile_classes(_REDACT_CLASSES)
+
+# signatures repeat heavily within an ingestion, so most calls are cache hits
+@lru_cache(maxsize=65536)
 def make_fingerprint(log_text):
     normalized = normalize_for_fingerprint(log_text)
     normalized_bytes = normalized.encode("utf-8")
@@ -16,44 +42,10 @@ def make_fingerprint(log_text):
     return fingerprint
 
 def normalize_for_fingerprint(text):
-    # Remove leading/trailing whitespace and convert to lowercase
-    text = text.strip().lower()
-    # Replace UUID patterns with a placeholder
-    text = re.sub(UUID_PATTERN, "<uuid>", text)
-    # Replace IP address patterns with a placeholder
-    text = re.sub(IP_PATTERN, "<ip>", text)
-    # Replace hexadecimal patterns with a placeholder
-    text = re.sub(HEX_PATTERN, "<hex>", text)
-    # Replace email address patterns with a placeholder
-    text = re.sub(EMAIL_PATTERN, "<email>", text)
-    # Replace URL patterns with a placeholder
-    text = re.sub(URL_PATTERN, "<url>", text)
-    # Replace token-like patterns with a placeholder
-    text = re.sub(TOKEN_PATTERN, "<token>", text)
-    # Replace timestamp patterns with a placeholder
-    text = re.sub(TIMESTAMP_PATTERN, "<timestamp>", text)
-    # Replace long numeric sequences (ports, ids, etc..) with a placeholder
-    text = re.sub(r"\b\d{4,}\b", "<number>", text)
-    # Collapse multiple spaces into one
-    text = re.sub(r"\s+", " ", text)
-    return text
+    # Lowercase, then replace uuids, ips, hex, emails, urls, tokens, timestamps and long numbers
+    # with placeholders and collapse whitespace, all in a single scan
+    return FINGERPRINT_RE.sub(_fingerprint_repl, text.strip().lower())
 
 def redact_message(text):
-    # Remove leading/trailing whitespace and convert to lowercase
-    text = text.strip().lower()
-    # Replace UUID patterns with a placeholder
-    text = re.sub(UUID_PATTERN, "<uuid>", text)
-    # Replace IP address patterns with a placeholder
-    text = re.sub(IP_PATTERN, "<ip>", text)
-    # Replace hexadecimal patterns with a placeholder
-    text = re.sub(HEX_PATTERN, "<hex>", text)
-    # Replace email address patterns with a placeholder
-    text = re.sub(EMAIL_PATTERN, "<email>", text)
-    # Replace URL patterns with a placeholder
-    text = re.sub(URL_PATTERN, "<url>", text)
-    # Replace token-like patterns with a placeholder
-    text = re.sub(TOKEN_PATTERN, "<token>", text)
-    # Collapse multiple spaces into one
-    text = re.sub(r"\s+", " ", text)
-    return text
-
+    # Same as normalize_for_fingerprint but keeps timestamps and numbers
+    return REDACT_RE.sub(_redact_repl, text.strip().lower())
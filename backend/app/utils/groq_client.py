@@ -1,27 +1,26 @@
 from typing import List, Dict, Generator
-from groq import Groq, GroqError
+from groq import Groq
 from app.config import settings
 
 # Initialize the client
-client = Groq(api_key=settings.groq_api_key)
+client = Groq(api_key=settings.groq_api_key, base_url=settings.groq_base_url)
 
-def chat_completion(
+def stream_chat_completion(
     messages: List[Dict[str, str]],
     temperature: float = 0.2
 ) -> Generator[str, None, None]:
     """
-    Chat completion
+    Chat completion, yielding content deltas as the model produces them
     """
+    stream = client.chat.completions.create(
+        model=settings.groq_llm_model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+    )
     try:
-        result = client.chat.completions.create(
-            model=settings.groq_llm_model,
-            messages=messages,
-            temperature=temperature,
-        )
-
-        return result.choices[0].message.content.strip()
-
-    except GroqError as e:
-        raise e
-    except Exception as e:
-        raise e
\ No newline at end of file
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
@@ -0,0 +1,105 @@
+import json
+from typing import Any, Awaitable, Callable
+
+import redis
+import redis.asyncio
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+r = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+# same cache for endpoints running on the event loop
+async_r = redis.asyncio.Redis.from_url(settings.redis_url, decode_responses=True)
+
+# one hash per ingestion, field = endpoint + parameters, so invalidation is a single DEL
+CACHE_KEY_PREFIX = "cache:ingestion"
+CACHE_STATS_KEY = "cache:ingestion-stats"
+
+def _cache_key(ingestion_id) -> str:
+    return f"{CACHE_KEY_PREFIX}:{ingestion_id}"
+
+def _cache_field(endpoint: str, params: dict) -> str:
+    return ":".join([endpoint] + [f"{name}={params[name]}" for name in sorted(params)])
+
+def is_cacheable(ingestion) -> bool:
+    """Results only stop changing once both ingestion and findings analysis are done"""
+    return ingestion.status == "done" and ingestion.finding_status == "done"
+
+def cached_ingestion_response(ingestion, endpoint: str, params: dict, build: Callable[[], Any]):
+    """Read-through cache for the read endpoints of a finished ingestion.
+
+    build() produces the response body on a miss; it is stored JSON-encoded and served
+    as-is on later hits. Redis errors fall through to build() so the API never depends on the cache.
+    """
+    if not settings.ingestion_cache_enabled or not is_cacheable(ingestion):
+        return build()
+    key = _cache_key(ingestion.id)
+    field = _cache_field(endpoint, params)
+    try:
+        cached = r.hget(key, field)
+    except redis.RedisError:
+        return build()
+    if cached is not None:
+        _count(endpoint, "hits")
+        return Response(content=cached, media_type="application/json")
+    body = jsonable_encoder(build())
+    try:
+        _store_pipeline(r.pipeline(transaction=False), key, field, endpoint, body).execute()
+    except redis.RedisError:
+        pass
+    return body
+
+async def cached_ingestion_response_async(ingestion, endpoint: str, params: dict, build: Callable[[], Awaitable[Any]]):
+    """cached_ingestion_response for async endpoints; build() is awaited on a miss"""
+    if not settings.ingestion_cache_enabled or not is_cacheable(ingestion):
+        return await build()
+    key = _cache_key(ingestion.id)
+    field = _cache_field(endpoint, params)
+    try:
+        cached = await async_r.hget(key, field)
+    except redis.RedisError:
+        return await build()
+    if cached is not None:
+        try:
+            await async_r.hincrby(CACHE_STATS_KEY, f"{endpoint}:hits", 1)
+        except redis.RedisError:
+            pass
+        return Response(content=cached, media_type="application/json")
+    body = jsonable_encoder(await build())
+    try:
+        await _store_pipeline(async_r.pipeline(transaction=False), key, field, endpoint, body).execute()
+    except redis.RedisError:
+        pass
+    return body
+
+def _store_pipeline(pipe, key: str, field: str, endpoint: str, body):
+    pipe.hset(key, field, json.dumps(body, ensure_ascii=False, separators=(",", ":")))
+    pipe.expire(key, settings.ingestion_cache_ttl_seconds)
+    pipe.hincrby(CACHE_STATS_KEY, f"{endpoint}:misses", 1)
+    return pipe
+
+def invalidate_ingestion_cache(ingestion_id):
+    """Drop every cached response of an ingestion (re-ingestion, re-analysis, new insight, delete)"""
+    try:
+        r.delete(_cache_key(ingestion_id))
+    except redis.RedisError:
+        pass
+
+def _count(endpoint: str, outcome: str):
+    try:
+        r.hincrby(CACHE_STATS_KEY, f"{endpoint}:{outcome}", 1)
+    except redis.RedisError:
+        pass
+
+def get_cache_stats() -> dict:
+    """Hit and miss counters per endpoint, summed over all API workers"""
+    try:
+        counters = r.hgetall(CACHE_STATS_KEY)
+    except redis.RedisError:
+        return {}
+    stats = {}
+    for name, value in counters.items():
+        endpoint, outcome = name.rsplit(":", 1)
+        stats.setdefault(endpoint, {"hits": 0, "misses": 0})[outcome] = int(value)
+    return stats
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+r = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+# one string per completion, addressed by the hash of everything that determines it
+CACHE_KEY_PREFIX = "cache:insight"
+# last-access time of every cached completion, for LRU eviction
+CACHE_LRU_KEY = "cache:insight-lru"
+
+def insight_cache_key(messages: list[dict], model: str, temperature: float) -> str:
+    """Same prompt, model and temperature -> same key, whichever ingestion or scope asked"""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def get_cached_insight(key: str) -> Optional[str]:
+    if not settings.insight_cache_enabled:
+        return None
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.zadd(CACHE_LRU_KEY, {key: time.time()}, xx=True)
+        result, _ = pipe.execute()
+    except redis.RedisError:
+        return None
+    return result
+
+def store_insight(key: str, result: str):
+    """Cache a completion for insight_cache_ttl_seconds, evicting the least recently used beyond insight_cache_max_entries"""
+    if not settings.insight_cache_enabled:
+        return
+    ttl = settings.insight_cache_ttl_seconds
+    now = time.time()
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.set(key, result, ex=ttl)
+        pipe.zadd(CACHE_LRU_KEY, {key: now})
+        # entries untouched for a whole TTL point at keys Redis has already expired
+        pipe.zremrangebyscore(CACHE_LRU_KEY, "-inf", now - ttl)
+        pipe.zcard(CACHE_LRU_KEY)
+        size = pipe.execute()[-1]
+        if size > settings.insight_cache_max_entries:
+            evicted = r.zpopmin(CACHE_LRU_KEY, size - settings.insight_cache_max_entries)
+            if evicted:
+                r.delete(*(evicted_key for evicted_key, _ in evicted))
+    except redis.RedisError:
+        pass
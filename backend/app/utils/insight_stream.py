@@ -0,0 +1,51 @@
+import json
+from typing import Optional
+
+import redis
+import redis.asyncio
+
+from app.config import settings
+
+r = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+# the SSE endpoint reads on the event loop
+async_r = redis.asyncio.Redis.from_url(settings.redis_url, decode_responses=True)
+
+# one Redis stream per insight job: "delta" entries while the model writes, then one "end" entry.
+# A stream rather than pub/sub so a client that connects late replays what it missed.
+STREAM_KEY_PREFIX = "stream:insight"
+STREAM_TTL_SECONDS = 600
+
+def _stream_key(job_id) -> str:
+    return f"{STREAM_KEY_PREFIX}:{job_id}"
+
+def reset_insight_stream(job_id):
+    """Drop the entries of a previous run before the job is queued again"""
+    try:
+        r.delete(_stream_key(job_id))
+    except redis.RedisError:
+        pass
+
+def _publish(job_id, fields: dict):
+    key = _stream_key(job_id)
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.xadd(key, fields)
+        pipe.expire(key, STREAM_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError:
+        # readers fall back to the stored analysis once the job finishes
+        pass
+
+def publish_insight_delta(job_id, text: str):
+    _publish(job_id, {"type": "delta", "text": text})
+
+def publish_insight_end(job_id, status: str, insight: Optional[str] = None, error: Optional[str] = None):
+    _publish(job_id, {"type": "end", "status": status, "insight": insight or "", "error": error or ""})
+
+async def read_insight_stream(job_id, last_id: str, block_ms: int) -> list[tuple[str, dict]]:
+    """Entries after last_id, waiting up to block_ms for the first one"""
+    response = await async_r.xread({_stream_key(job_id): last_id}, block=block_ms)
+    return response[0][1] if response else []
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,8 +1,9 @@
-from typing import Any, Optional, List, Tuple
+from typing import Any, Iterable, Iterator, Optional, List, Tuple
 import re
 import json
-from dateutil import parser as date_parser
-from dateutil.parser import ParserError
+import orjson
+from itertools import chain, islice
+from app.utils.timestamps import TimestampParser
 
 # ----------------------------
 # Regex building blocks - ENHANCED
@@ -157,30 +158,41 @@ def is_stack_trace_line(line: str) -> bool:
             s.startswith('File "') or
             re.match(r'\s+at\s+[\w$.]+\(', s))
 
+# Bounds for finding a pretty-printed JSON object inside a multi-line record
+MAX_JSON_BLOCK_LINES = 500
+MAX_JSON_DECODE_ATTEMPTS = 8
+
 def extract_from_json(raw: str) -> Optional[dict]:
     """Extract fields from JSON log lines"""
     lines = raw.splitlines()
-    json_obj = None
+    
+    # Index of the closing line ('}') that ends a block opened at each line
+    close_at = [len(lines) - 1] * len(lines)
+    next_close = len(lines) - 1
+    for i in range(len(lines) - 1, 0, -1):
+        if lines[i].strip().startswith('}'):
+            next_close = i
+        close_at[i - 1] = next_close
     
     # Try to find JSON in first line or as complete multiline JSON
+    attempts = 0
     for i, line in enumerate(lines):
         stripped = line.strip()
-        if stripped.startswith('{'):
-            # Accumulate until we have complete JSON
-            json_str = stripped
-            for next_line in lines[i+1:]:
-                if next_line.strip().startswith('}'):
-                    json_str += '\n' + next_line
-                    break
-                json_str += '\n' + next_line
-            try:
-                json_obj = json.loads(json_str)
+        if not stripped.startswith('{'):
+            continue
+        end = close_at[i]
+        if end - i >= MAX_JSON_BLOCK_LINES:
+            continue
+        json_str = '\n'.join([stripped] + lines[i + 1:end + 1])
+        try:
+            json_obj = json.loads(json_str)
+        except json.JSONDecodeError:
+            attempts += 1
+            if attempts >= MAX_JSON_DECODE_ATTEMPTS:
                 break
-            except json.JSONDecodeError:
-                continue
+            continue
+        return json_obj or None
     
-    if json_obj:
-        return json_obj
     return None
 
 def extract_timestamp(text: str) -> Tuple[Optional[str], str, float]:
@@ -290,18 +302,28 @@ def build_signature(record: dict, message: str) -> str:
         return lines[0].strip()
     
     # For normal logs, use message without dynamic parts
+    return message_signature(message)
+
+RE_SIG_REQ_ID = re.compile(r'[\[\(]?req-id:?\s*[a-f0-9-]+[\]\)]?')
+RE_SIG_USER = re.compile(r'user[:_]?\w+')
+RE_SIG_ORDER = re.compile(r'order[:_]?\w+')
+RE_SIG_TXN = re.compile(r'txn[:_]?\w+')
+RE_SIG_SPACES = re.compile(r'\s+')
+
+def message_signature(message: str) -> str:
+    """Signature of a plain (non stack trace) log message"""
     # Remove timestamps, IDs, etc.
     signature = message
     # Remove request IDs
-    signature = re.sub(r'[\[\(]?req-id:?\s*[a-f0-9-]+[\]\)]?', '', signature)
+    signature = RE_SIG_REQ_ID.sub('', signature)
     # Remove user IDs
-    signature = re.sub(r'user[:_]?\w+', 'user', signature)
+    signature = RE_SIG_USER.sub('user', signature)
     # Remove order IDs
-    signature = re.sub(r'order[:_]?\w+', 'order', signature)
+    signature = RE_SIG_ORDER.sub('order', signature)
     # Remove transaction IDs
-    signature = re.sub(r'txn[:_]?\w+', 'txn', signature)
+    signature = RE_SIG_TXN.sub('txn', signature)
     # Clean up extra spaces
-    signature = re.sub(r'\s+', ' ', signature).strip()
+    signature = RE_SIG_SPACES.sub(' ', signature).strip()
     
     return signature[:300]
 
@@ -335,9 +357,8 @@ def is_new_record(line: str) -> bool:
     
     return False
 
-def group_lines_into_record(lines: list[str]) -> list[list[str]]:
-    """Group log lines into multi-line records"""
-    records = []
+def iter_records(lines: Iterable[str]) -> Iterator[list[str]]:
+    """Lazily group log lines into multi-line records"""
     current = []
     
     for line in lines:
@@ -347,23 +368,21 @@ def group_lines_into_record(lines: list[str]) -> list[list[str]]:
             continue
             
         if is_new_record(line) and current:
-            records.append(current)
+            yield current
             current = [line]
         else:
             current.append(line)
     
     if current:
-        records.append(current)
-    
-    return records
+        yield current
 
-def parse_record(record_lines: list[str]) -> dict[str, Any]:
-    """Parse a single log record"""
-    raw = '\n'.join(record_lines)
-    header = record_lines[0] if record_lines else ''
-    
-    result = {
-        'raw': raw,
+def group_lines_into_record(lines: Iterable[str]) -> list[list[str]]:
+    """Group log lines into multi-line records"""
+    return list(iter_records(lines))
+
+def _new_result(record_lines: list[str]) -> dict[str, Any]:
+    return {
+        'raw': '\n'.join(record_lines),
         'ts': None,
         'ts_raw': None,
         'service': None,
@@ -373,36 +392,30 @@ def parse_record(record_lines: list[str]) -> dict[str, Any]:
         'metadata': {},
         'parse': {'kind': 'text', 'confidence': 0.0}
     }
+
+def _parse_json_fields(result: dict[str, Any], json_obj: dict, header: str, ts_parser: TimestampParser) -> dict[str, Any]:
+    # Extract common fields
+    ts = (json_obj.get('ts') or json_obj.get('time') or 
+          json_obj.get('timestamp') or json_obj.get('@timestamp'))
+    level = (json_obj.get('level') or json_obj.get('severity') or 
+            json_obj.get('log.level'))
+    service = (json_obj.get('service') or json_obj.get('svc') or 
+              json_obj.get('app') or json_obj.get('component'))
+    msg = (json_obj.get('message') or json_obj.get('msg') or 
+           json_obj.get('event') or header)
+    
+    result['ts_raw'] = str(ts) if ts else None
+    result['ts'] = ts_parser.parse(ts)
+    
+    result['level'] = normalize_level(str(level)) if level else None
+    result['service'] = str(service) if service else None
+    result['message'] = str(msg).strip()[:500]
+    result['attrs'] = json_obj
+    result['parse'] = {'kind': 'json', 'confidence': 0.98}
     
-    # Try JSON parsing first
-    json_obj = extract_from_json(raw)
-    if json_obj:
-        # Extract common fields
-        ts = (json_obj.get('ts') or json_obj.get('time') or 
-              json_obj.get('timestamp') or json_obj.get('@timestamp'))
-        level = (json_obj.get('level') or json_obj.get('severity') or 
-                json_obj.get('log.level'))
-        service = (json_obj.get('service') or json_obj.get('svc') or 
-                  json_obj.get('app') or json_obj.get('component'))
-        msg = (json_obj.get('message') or json_obj.get('msg') or 
-               json_obj.get('event') or header)
-        
-        result['ts_raw'] = str(ts) if ts else None
-        try:
-            result['ts'] = date_parser.parse(ts) if ts else None
-        except:
-            result['ts'] = None
-        
-        result['level'] = normalize_level(str(level)) if level else None
-        result['service'] = str(service) if service else None
-        result['message'] = str(msg).strip()[:500]
-        result['attrs'] = json_obj
-        result['parse'] = {'kind': 'json', 'confidence': 0.98}
-        result['signature'] = build_signature(result, result['message'])
-        
-        return result
-    
-    # Text parsing
+    return result
+
+def _parse_text_fields(result: dict[str, Any], header: str, ts_parser: TimestampParser) -> dict[str, Any]:
     text = header
     matched = []
     
@@ -410,10 +423,7 @@ def parse_record(record_lines: list[str]) -> dict[str, Any]:
     ts, text, ts_conf = extract_timestamp(text)
     if ts:
         result['ts_raw'] = ts
-        try:
-            result['ts'] = date_parser.parse(ts)
-        except:
-            result['ts'] = None
+        result['ts'] = ts_parser.parse(ts)
         matched.append('timestamp')
     
     # Extract service
@@ -449,8 +459,82 @@ def parse_record(record_lines: list[str]) -> dict[str, Any]:
     
     return result
 
+def parse_record(record_lines: list[str], ts_parser: Optional[TimestampParser] = None) -> dict[str, Any]:
+    """Parse a single log record"""
+    if ts_parser is None:
+        ts_parser = TimestampParser()
+    result = _new_result(record_lines)
+    header = record_lines[0] if record_lines else ''
+    
+    # Try JSON parsing first
+    json_obj = extract_from_json(result['raw'])
+    if json_obj:
+        _parse_json_fields(result, json_obj, header, ts_parser)
+        result['signature'] = build_signature(result, result['message'])
+        return result
+    
+    # Text parsing
+    return _parse_text_fields(result, header, ts_parser)
+
+def parse_json_line_record(record_lines: list[str], ts_parser: TimestampParser) -> dict[str, Any]:
+    """Specialized parser for JSON-lines uploads: decode the single line once with orjson, no multi-line probing"""
+    if len(record_lines) == 1:
+        stripped = record_lines[0].strip()
+        if stripped.startswith('{'):
+            try:
+                json_obj = orjson.loads(stripped)
+            except orjson.JSONDecodeError:
+                json_obj = None
+            if json_obj and isinstance(json_obj, dict):
+                result = _parse_json_fields(_new_result(record_lines), json_obj, record_lines[0], ts_parser)
+                # a single line opening with '{' can't be a stack trace line
+                result['signature'] = message_signature(result['message'])
+                return result
+    # multi-line or malformed record: use the generic cascade
+    return parse_record(record_lines, ts_parser)
+
+def parse_text_record(record_lines: list[str], ts_parser: TimestampParser) -> dict[str, Any]:
+    """Specialized parser for plain-text uploads: skip the JSON probe unless a line could start a JSON object"""
+    if any(line.lstrip().startswith('{') for line in record_lines):
+        return parse_record(record_lines, ts_parser)
+    return _parse_text_fields(_new_result(record_lines), record_lines[0] if record_lines else '', ts_parser)
+
+# Lines looked at to classify an upload
+SNIFF_SAMPLE_LINES = 300
+# Share of sampled lines that must be JSON objects for an upload to count as JSON-lines
+SNIFF_JSON_RATIO = 0.9
+
+def sniff_format(sample: list[str]) -> str:
+    """Classify an upload from its first lines as 'json' (JSON-lines), 'text' or 'mixed'"""
+    lines = [line.strip() for line in sample if line.strip()]
+    if not lines:
+        return 'mixed'
+    json_lines = sum(1 for line in lines if line.startswith('{') and line.endswith('}'))
+    if json_lines >= len(lines) * SNIFF_JSON_RATIO:
+        return 'json'
+    if not any(line.startswith('{') for line in lines):
+        return 'text'
+    return 'mixed'
+
+RECORD_PARSERS = {
+    'json': parse_json_line_record,
+    'text': parse_text_record,
+    'mixed': parse_record,
+}
+
 def parse_logs(logs: str) -> list[dict[str, Any]]:
     """Parse a string of logs into structured records"""
-    lines = logs.splitlines()
-    records = group_lines_into_record(lines)
-    return [parse_record(record) for record in records]
\ No newline at end of file
+    return list(iter_parsed_logs(logs.splitlines()))
+
+def iter_parsed_logs(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Parse an iterable of log lines (e.g. an open file) into structured records one at a time.
+
+    The first SNIFF_SAMPLE_LINES lines pick a specialized record parser for the upload;
+    records it cannot handle fall back to the generic parse_record cascade.
+    """
+    lines = iter(lines)
+    sample = list(islice(lines, SNIFF_SAMPLE_LINES))
+    record_parser = RECORD_PARSERS[sniff_format(sample)]
+    ts_parser = TimestampParser()
+    for record in iter_records(chain(sample, lines)):
+        yield record_parser(record, ts_parser)
@@ -0,0 +1,200 @@
+"""Prometheus metrics for the API and the Celery workers.
+
+With PROMETHEUS_MULTIPROC_DIR set (uvicorn --workers > 1, Celery prefork), every process
+writes its samples to that directory and a scrape aggregates them; otherwise the default
+in-process registry is served.
+"""
+import os
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, start_http_server
+from prometheus_client.core import CounterMetricFamily
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.utils.ingestion_cache import get_cache_stats
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+)
+
+INGESTION_STAGE_DURATION = Histogram(
+    "ingestion_stage_duration_seconds",
+    "Time spent in each stage of an ingestion task, excluding nested stages",
+    ["task", "stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, float("inf")),
+)
+INGESTION_BYTES_READ = Counter("ingestion_read_bytes", "Uncompressed bytes of stored log text read by ingestion")
+INGESTION_RECORDS_PARSED = Counter("ingestion_records_parsed", "Log records parsed and written as log events")
+INGESTION_RECORDS_PER_SECOND = Gauge(
+    "ingestion_records_per_second",
+    "Throughput of the most recently finished ingestion",
+    multiprocess_mode="mostrecent",
+)
+INGESTIONS = Counter("ingestion_tasks", "Finished ingestion tasks", ["task", "status"])
+INSIGHT_CACHE_LOOKUPS = Counter("insight_cache_lookups", "AI insight cache lookups", ["outcome"])
+
+# recorded by the instrumented pools in app.db, in whichever process checks out the connection,
+# so Celery prefork children are covered and not just the process serving the scrape
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections currently open", ["engine"], multiprocess_mode="livesum")
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection, by checkouts that got one",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, float("inf")),
+)
+DB_POOL_CHECKOUT_WAIT_MAX = Gauge("db_pool_checkout_wait_max_seconds", "Longest wait for a connection", ["engine"], multiprocess_mode="livemax")
+DB_POOL_CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts", "Checkouts that gave up waiting for a connection", ["engine"])
+
+
+class StageTimer:
+    """Wall time per stage of one task run.
+
+    Stages nest (read runs inside parse, which runs inside the insert pulling rows), and each
+    stage is charged only for its own time, so the stage totals add up to the task's runtime.
+    """
+
+    def __init__(self, task: str):
+        self.task = task
+        self.seconds = {}
+        self._stack = []
+        self._mark = time.perf_counter()
+
+    def start(self, stage: str):
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.seconds[outer] = self.seconds.get(outer, 0.0) + now - self._mark
+        self._stack.append(stage)
+        self._mark = now
+
+    def stop(self):
+        now = time.perf_counter()
+        stage = self._stack.pop()
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + now - self._mark
+        self._mark = now
+
+    def stage(self, stage: str):
+        return _Stage(self, stage)
+
+    def iter(self, iterable, stage: str):
+        """Charge the time spent producing each item of iterable to stage"""
+        it = iter(iterable)
+        start, stop = self.start, self.stop
+        while True:
+            start(stage)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                stop()
+            yield item
+
+    def observe(self):
+        for stage, seconds in self.seconds.items():
+            INGESTION_STAGE_DURATION.labels(task=self.task, stage=stage).observe(seconds)
+
+
+class _Stage:
+    __slots__ = ("timer", "name")
+
+    def __init__(self, timer: StageTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer.start(self.name)
+
+    def __exit__(self, *exc_info):
+        self.timer.stop()
+
+
+def observe_ingestion(timer: StageTimer, bytes_read: int, records: int):
+    timer.observe()
+    INGESTION_BYTES_READ.inc(bytes_read)
+    INGESTION_RECORDS_PARSED.inc(records)
+    elapsed = sum(timer.seconds.values())
+    if elapsed > 0:
+        INGESTION_RECORDS_PER_SECOND.set(records / elapsed)
+
+
+def observe_pool_checkout(engine: str, seconds: float, max_seconds: float, timed_out: bool = False):
+    if timed_out:
+        DB_POOL_CHECKOUT_TIMEOUTS.labels(engine=engine).inc()
+    else:
+        DB_POOL_CHECKOUT_WAIT.labels(engine=engine).observe(seconds)
+    DB_POOL_CHECKOUT_WAIT_MAX.labels(engine=engine).set(max_seconds)
+
+
+def observe_pool_occupancy(engine: str, pool):
+    DB_POOL_SIZE.labels(engine=engine).set(pool.size())
+    DB_POOL_CHECKED_OUT.labels(engine=engine).set(pool.checkedout())
+    DB_POOL_OVERFLOW.labels(engine=engine).set(max(pool.overflow(), 0))
+
+
+class CacheStatsCollector:
+    """Response cache hits and misses per endpoint; the counters live in Redis and cover all API processes"""
+
+    def collect(self):
+        family = CounterMetricFamily("ingestion_cache_requests", "Response cache lookups", labels=["endpoint", "outcome"])
+        for endpoint, counts in get_cache_stats().items():
+            for outcome, value in counts.items():
+                family.add_metric([endpoint, outcome], value)
+        return [family]
+
+
+def build_registry(collectors=()) -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def _route_template(scope) -> str:
+    if scope.get("route") is None:
+        return "unmatched"
+    # rebuilt from the path because route.path is only relative to the router on recent FastAPI versions
+    params = {str(value): f"{{{name}}}" for name, value in scope.get("path_params", {}).items()}
+    return "/".join(params.get(segment, segment) for segment in scope["path"].split("/"))
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Record request latency labelled by route template, so path ids do not blow up cardinality"""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        start_time = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method=request.method,
+                route=_route_template(request.scope),
+                status=str(status),
+            ).observe(time.perf_counter() - start_time)
+
+
+def metrics_response(registry: CollectorRegistry) -> Response:
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def start_worker_metrics_server(port: int):
+    """Serve /metrics from the Celery main process; prefork children are included through the multiprocess dir"""
+    start_http_server(port, registry=build_registry())
+
+
+def mark_worker_process_dead(pid: int):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
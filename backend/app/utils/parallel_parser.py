@@ -0,0 +1,53 @@
+from collections import deque
+from typing import Any, Iterable, Iterator
+
+import billiard
+
+from app.utils.fingerprint import make_fingerprint
+from app.utils.log_parser import is_new_record, iter_parsed_logs
+
+# lines per shard; shards are only cut where a new record starts
+SHARD_LINES = 50_000
+
+def iter_shards(lines: Iterable[str], shard_lines: int = SHARD_LINES) -> Iterator[list[str]]:
+    """Split lines into shards at record boundaries.
+
+    A shard is only closed on a line that would start a new record in group_lines_into_record,
+    so multi-line records (stack traces, pretty-printed JSON) never straddle two shards and
+    grouping each shard independently gives the same records as grouping the whole input.
+    """
+    shard = []
+    for line in lines:
+        if len(shard) >= shard_lines and line.strip() and is_new_record(line):
+            yield shard
+            shard = []
+        shard.append(line)
+    if shard:
+        yield shard
+
+def parse_shard(lines: list[str]) -> list[dict[str, Any]]:
+    """Parse and fingerprint one shard; runs inside a pool process"""
+    records = []
+    for record in iter_parsed_logs(lines):
+        record["fingerprint"] = make_fingerprint(record.get("signature"))
+        records.append(record)
+    return records
+
+def iter_parsed_logs_parallel(lines: Iterable[str], workers: int, shard_lines: int = SHARD_LINES) -> Iterator[dict[str, Any]]:
+    """Parse lines across a process pool, yielding records in input order.
+
+    The pool is billiard's rather than concurrent.futures': the task runs inside a Celery
+    prefork child, which is a daemonic process, and only billiard lets it start children.
+    Results are consumed strictly in shard order so the caller can assign seq numbers
+    with a plain enumerate and get the same numbering as the sequential parser.
+    At most 2 * workers shards are in flight to keep memory bounded.
+    """
+    max_pending = workers * 2
+    with billiard.Pool(processes=workers) as pool:
+        pending = deque()
+        for shard in iter_shards(lines, shard_lines):
+            pending.append(pool.apply_async(parse_shard, (shard,)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
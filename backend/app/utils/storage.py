@@ -1,18 +1,340 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, TextIO
+from compression import zstd
 from app.config import settings
+import codecs
+import io
+import itertools
 import os
+import struct
+import zlib
 
 STORAGE_DIR = settings.storage_dir
 
-def save_ingestion_text(ingestion_id: str, text: str):
+# Target uncompressed size of one stored zstd frame; frames are cut after a newline
+STORAGE_FRAME_SIZE = 1_048_576
+
+# zstd seekable format: a skippable frame at the end of the file holding
+# (compressed size, decompressed size) per frame, followed by a 9 byte footer
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SKIPPABLE_HEADER = struct.Struct("<II")
+SEEK_TABLE_ENTRY = struct.Struct("<II")
+SEEK_TABLE_FOOTER = struct.Struct("<IBI")
+SEEK_TABLE_CHECKSUM_FLAG = 0x80
+
+def get_ingestion_path(ingestion_id: str) -> str:
+    return os.path.join(STORAGE_DIR, "ingestions", f"{ingestion_id}.txt")
+
+def get_compressed_ingestion_path(ingestion_id: str) -> str:
+    return os.path.join(STORAGE_DIR, "ingestions", f"{ingestion_id}.zst")
+
+def get_stored_ingestion_path(ingestion_id: str) -> str:
+    """Path of whichever stored file exists for the ingestion, compressed first"""
+    for file_path in (get_compressed_ingestion_path(ingestion_id), get_ingestion_path(ingestion_id)):
+        if os.path.exists(file_path):
+            return file_path
+    raise FileNotFoundError(f"Ingestion text file for ID {ingestion_id} not found.")
+
+class SeekableZstdWriter:
+    """Writes bytes as independent zstd frames of about frame_size uncompressed bytes,
+    each ending on a line boundary, and appends the seek table on close()"""
+    def __init__(self, f: BinaryIO, level: int, frame_size: int = STORAGE_FRAME_SIZE):
+        self._f = f
+        self._level = level
+        self._frame_size = frame_size
+        self._buf = bytearray()
+        self.frames: list[tuple[int, int]] = []
+
+    def write(self, data: bytes):
+        self._buf += data
+        while len(self._buf) >= self._frame_size:
+            cut = self._buf.rfind(b"\n", 0, self._frame_size) + 1 or self._frame_size
+            self._write_frame(self._buf[:cut])
+            del self._buf[:cut]
+
+    def _write_frame(self, data: bytes):
+        compressed = zstd.compress(bytes(data), self._level)
+        self._f.write(compressed)
+        self.frames.append((len(compressed), len(data)))
+
+    def close(self):
+        if self._buf:
+            self._write_frame(self._buf)
+            self._buf.clear()
+        table = b"".join(SEEK_TABLE_ENTRY.pack(c, d) for c, d in self.frames)
+        footer = SEEK_TABLE_FOOTER.pack(len(self.frames), 0, SEEKABLE_MAGIC)
+        self._f.write(SKIPPABLE_HEADER.pack(SKIPPABLE_FRAME_MAGIC, len(table) + len(footer)))
+        self._f.write(table)
+        self._f.write(footer)
+
+def read_seek_table(f: BinaryIO) -> list[tuple[int, int]]:
+    """(compressed size, decompressed size) of every frame in a seekable zstd file"""
+    f.seek(-SEEK_TABLE_FOOTER.size, os.SEEK_END)
+    count, descriptor, magic = SEEK_TABLE_FOOTER.unpack(f.read(SEEK_TABLE_FOOTER.size))
+    if magic != SEEKABLE_MAGIC:
+        raise ValueError("Stored ingestion file has no zstd seek table")
+    entry_size = SEEK_TABLE_ENTRY.size + (4 if descriptor & SEEK_TABLE_CHECKSUM_FLAG else 0)
+    f.seek(-(SEEK_TABLE_FOOTER.size + count * entry_size), os.SEEK_END)
+    table = f.read(count * entry_size)
+    return [SEEK_TABLE_ENTRY.unpack_from(table, i * entry_size) for i in range(count)]
+
+class SeekableZstdReader(io.RawIOBase):
+    """Raw stream over the decompressed contents of a seekable zstd file, one frame in memory at a time"""
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._frames = iter(read_seek_table(f))
+        f.seek(0)
+        self._buf = b""
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._pos >= len(self._buf):
+            frame = next(self._frames, None)
+            if frame is None:
+                return 0
+            self._buf = zstd.decompress(self._f.read(frame[0]))
+            self._pos = 0
+        n = min(len(b), len(self._buf) - self._pos)
+        b[:n] = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+def open_ingestion_text(ingestion_id: str, newline: Optional[str] = None) -> TextIO:
+    """Open the stored ingestion text for streaming reads, decompressing frame by frame if needed"""
+    file_path = get_stored_ingestion_path(ingestion_id)
+    if file_path.endswith(".zst"):
+        raw = SeekableZstdReader(open(file_path, "rb"))
+        return io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8", newline=newline)
+    return open(file_path, "r", encoding="utf-8", newline=newline)
+
+def get_ingestion_size(ingestion_id: str) -> int:
+    """Uncompressed size of the stored ingestion text in bytes"""
+    file_path = get_stored_ingestion_path(ingestion_id)
+    if file_path.endswith(".zst"):
+        with open(file_path, "rb") as f:
+            return sum(d for _, d in read_seek_table(f))
+    return os.path.getsize(file_path)
+
+@contextmanager
+def open_ingestion_writer(ingestion_id: str) -> Iterator[BinaryIO]:
+    """Write the ingestion text in the configured storage format (settings.storage_compression).
+
+    The file is written under a temporary name and only replaces the stored text when the
+    block exits cleanly; a stored copy in the other format is removed then.
+    """
     os.makedirs(os.path.join(STORAGE_DIR, "ingestions"), exist_ok=True)
-    file_path = os.path.join(STORAGE_DIR, "ingestions", f"{ingestion_id}.txt")
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(text)
-    return file_path
+    compressed = settings.storage_compression == "zstd"
+    file_path = get_compressed_ingestion_path(ingestion_id) if compressed else get_ingestion_path(ingestion_id)
+    stale_path = get_ingestion_path(ingestion_id) if compressed else get_compressed_ingestion_path(ingestion_id)
+    tmp_path = f"{file_path}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            if compressed:
+                writer = SeekableZstdWriter(f, settings.storage_zstd_level)
+                yield writer
+                writer.close()
+            else:
+                yield f
+        os.replace(tmp_path, file_path)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def save_ingestion_text(ingestion_id: str, text: str):
+    with open_ingestion_writer(ingestion_id) as f:
+        f.write(text.encode("utf-8"))
+    return get_stored_ingestion_path(ingestion_id)
+
+# Uploads are read, decompressed and validated this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1_048_576
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+class UploadTooLargeError(Exception):
+    pass
+
+class UploadDecodeError(Exception):
+    pass
+
+class _GzipStream:
+    """Incremental gzip decompressor that also handles concatenated members"""
+    def __init__(self):
+        self._d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        if self._d.eof:
+            data = self._d.unused_data + data
+            if not data:
+                return b""
+            self._d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return self._d.decompress(self._d.unconsumed_tail + data, max_length)
+
+    def needs_input(self) -> bool:
+        return not self._d.unconsumed_tail and not (self._d.eof and self._d.unused_data)
+
+    def check_complete(self):
+        if not self._d.eof:
+            raise UploadDecodeError("Truncated gzip upload")
+
+class _ZstdStream:
+    """Incremental zstd decompressor that also handles concatenated frames"""
+    def __init__(self):
+        self._d = zstd.ZstdDecompressor()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        if self._d.eof:
+            data = self._d.unused_data + data
+            if not data:
+                return b""
+            self._d = zstd.ZstdDecompressor()
+        return self._d.decompress(data, max_length)
+
+    def needs_input(self) -> bool:
+        return self._d.needs_input and not (self._d.eof and self._d.unused_data)
+
+    def check_complete(self):
+        if not self._d.eof:
+            raise UploadDecodeError("Truncated zstd upload")
+
+def _iter_decompressed(chunks: Iterator[bytes], first: bytes) -> Iterator[bytes]:
+    """Yield the plain bytes of an upload, transparently decompressing gzip/zstd by magic number"""
+    if first.startswith(GZIP_MAGIC):
+        stream = _GzipStream()
+    elif first.startswith(ZSTD_MAGIC):
+        stream = _ZstdStream()
+    else:
+        yield first
+        yield from chunks
+        return
+    try:
+        for chunk in itertools.chain([first], chunks):
+            data = chunk
+            while True:
+                out = stream.decompress(data, UPLOAD_CHUNK_SIZE)
+                data = b""
+                if out:
+                    yield out
+                if stream.needs_input():
+                    break
+        stream.check_complete()
+    except (zlib.error, zstd.ZstdError) as e:
+        raise UploadDecodeError(f"Corrupt compressed upload: {e}") from e
+
+def save_ingestion_stream(ingestion_id: str, fileobj: BinaryIO, max_bytes: int) -> int:
+    """Stream an uploaded file to the ingestion's storage path.
+
+    gzip and zstd uploads are decompressed on the fly, the text is validated as UTF-8
+    chunk by chunk and at most max_bytes (compressed or decompressed) are accepted.
+    Nothing is left on disk when the upload is rejected. Returns the stored size in bytes.
+    """
+    received = 0
+
+    def read_chunks() -> Iterator[bytes]:
+        nonlocal received
+        while chunk := fileobj.read(UPLOAD_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            yield chunk
+
+    chunks = read_chunks()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    written = 0
+    with open_ingestion_writer(ingestion_id) as f:
+        for data in _iter_decompressed(chunks, next(chunks, b"")):
+            written += len(data)
+            if written > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            try:
+                decoder.decode(data)
+            except UnicodeDecodeError as e:
+                raise UploadDecodeError(f"Upload is not valid UTF-8 (byte {written - len(data) + e.start})") from e
+            f.write(data)
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise UploadDecodeError("Upload ends with a truncated UTF-8 sequence") from e
+    return written
 
 def read_ingestion_text(ingestion_id: str) -> str:
-    file_path = os.path.join(STORAGE_DIR, "ingestions", f"{ingestion_id}.txt")
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Ingestion text file for ID {ingestion_id} not found.")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
\ No newline at end of file
+    with open_ingestion_text(ingestion_id) as f:
+        return f.read()
+
+def iter_ingestion_lines(ingestion_id: str) -> Iterator[str]:
+    """Yield the stored ingestion text line by line, without line endings"""
+    with open_ingestion_text(ingestion_id) as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+class IngestionLineReader:
+    """Iterates the stored ingestion lines like iter_ingestion_lines, while remembering the
+    byte span of each line so parsed records can be located in the stored file later"""
+    def __init__(self, ingestion_id: str):
+        self.ingestion_id = ingestion_id
+        # (start byte, end byte of the content without line ending, blank) for lines read but not yet claimed
+        self._spans: deque[tuple[int, int, bool]] = deque()
+        self._started = False
+
+    def __iter__(self) -> Iterator[str]:
+        offset = 0
+        # newline="" keeps the original line endings so their byte length is known
+        with open_ingestion_text(ingestion_id=self.ingestion_id, newline="") as f:
+            for line in f:
+                content = line.rstrip("\r\n")
+                size = len(content) if content.isascii() else len(content.encode("utf-8"))
+                self._spans.append((offset, offset + size, not content.strip()))
+                offset += size + len(line) - len(content)
+                yield content
+
+    def claim_record(self, raw: str) -> tuple[int, int]:
+        """(byte offset, byte length) of the next parsed record, given its raw text"""
+        if not self._started:
+            # the parser drops blank lines before the first record
+            while self._spans[0][2]:
+                self._spans.popleft()
+            self._started = True
+        start = self._spans[0][0]
+        for _ in range(raw.count("\n")):
+            self._spans.popleft()
+        end = self._spans.popleft()[1]
+        return start, end - start
+
+def read_ingestion_range(ingestion_id: str, offset: int, length: int) -> bytes:
+    """Read length bytes of the stored (uncompressed) ingestion text starting at offset,
+    decompressing only the frames that cover the range"""
+    file_path = get_stored_ingestion_path(ingestion_id)
+    with open(file_path, "rb") as f:
+        if not file_path.endswith(".zst"):
+            f.seek(offset)
+            return f.read(length)
+        chunks = []
+        frame_start = compressed_start = 0
+        for compressed_size, size in read_seek_table(f):
+            frame_end = frame_start + size
+            if frame_end > offset and frame_start < offset + length:
+                f.seek(compressed_start)
+                data = zstd.decompress(f.read(compressed_size))
+                chunks.append(data[max(offset - frame_start, 0):offset + length - frame_start])
+            elif frame_start >= offset + length:
+                break
+            frame_start = frame_end
+            compressed_start += compressed_size
+        return b"".join(chunks)
+
+def read_record_text(ingestion_id: str, offset: int, length: int) -> str:
+    """Raw text of a record stored by byte range, with line endings normalized like the parser sees them"""
+    text = read_ingestion_range(ingestion_id, offset, length).decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
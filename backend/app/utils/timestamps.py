@@ -0,0 +1,73 @@
+import re
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from dateutil import parser as date_parser
+
+# Shapes produced by RE_TIMESTAMP / RE_TIMESTAMP_BRACKET in log_parser
+RE_ISO_T = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]\d{2}:\d{2})?")
+RE_SPACE_UTC = re.compile(r"(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)\s+UTC")
+RE_SPACE = re.compile(r"(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)")
+
+def as_utc(ts: datetime) -> datetime:
+    """Treat naive timestamps as UTC, the way timestamptz columns store them, so they compare with aware ones"""
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+def _fromisoformat(ts: str) -> Optional[datetime]:
+    # the shape regexes accept impossible dates such as 2024-02-30 or 25:00:00
+    try:
+        return datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+
+def _parse_iso_t(ts: str) -> Optional[datetime]:
+    if RE_ISO_T.fullmatch(ts):
+        return _fromisoformat(ts)
+    return None
+
+def _parse_space_utc(ts: str) -> Optional[datetime]:
+    m = RE_SPACE_UTC.fullmatch(ts)
+    if m:
+        result = _fromisoformat(f"{m.group(1)}T{m.group(2)}")
+        return result.replace(tzinfo=timezone.utc) if result else None
+    return None
+
+def _parse_space(ts: str) -> Optional[datetime]:
+    m = RE_SPACE.fullmatch(ts)
+    if m:
+        return _fromisoformat(f"{m.group(1)}T{m.group(2)}")
+    return None
+
+FAST_SHAPES = (_parse_iso_t, _parse_space_utc, _parse_space)
+
+class TimestampParser:
+    """Parses log timestamps, trying known shapes with datetime.fromisoformat before dateutil.
+
+    One instance is meant to live for a single ingestion: the shape that matched last is tried
+    first on the next call, since nearly every line of an upload uses the same format.
+    Unknown shapes, values that match a shape but are not real dates, and non-string values
+    fall back to dateutil; anything it cannot parse either gives None, never an exception.
+    """
+
+    def __init__(self):
+        self.last_shape = None
+
+    def parse(self, ts: Any) -> Optional[datetime]:
+        if not ts:
+            return None
+        if isinstance(ts, str):
+            if self.last_shape is not None:
+                result = self.last_shape(ts)
+                if result is not None:
+                    return result
+            for shape in FAST_SHAPES:
+                if shape is self.last_shape:
+                    continue
+                result = shape(ts)
+                if result is not None:
+                    self.last_shape = shape
+                    return result
+        try:
+            return date_parser.parse(ts)
+        except Exception:
+            return None
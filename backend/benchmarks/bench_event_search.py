@@ -0,0 +1,88 @@
+"""Event search latency against ingestion size: sequential scan vs pg_trgm index.
+
+"scan" evaluates the same case-insensitive substring test with strpos(), which
+the trigram index cannot serve, so it reflects the old sequential-scan cost.
+"contains" and "fuzzy" are the two q_mode values served by list_ingestion_events.
+
+Needs a migrated PostgreSQL database reachable via DATABASE_URL. Data is
+rolled back at the end.
+
+    python -m benchmarks.bench_event_search --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import func, text
+
+from app.db import SessionLocal
+from app.models.organization import Organization
+from app.models.project import Project
+from app.models.ingestion import Ingestion
+from app.models.log_event import LogEvent
+from app.crud.ingestions import list_ingestion_events
+from app.crud.log_events import build_log_event_row, copy_log_events
+
+WORDS = ["request", "completed", "user", "session", "cache", "miss", "hit", "order", "payment",
+         "timeout", "retry", "connection", "refused", "upstream", "gateway", "worker", "queue"]
+NEEDLE = "checksum mismatch on shard"
+
+
+def synthetic_rows(ingestion_id, n, seed=7):
+    rnd = random.Random(seed)
+    for seq in range(1, n + 1):
+        message = " ".join(rnd.choice(WORDS) for _ in range(8)) + f" id={rnd.randint(1, 10**9)}"
+        if seq % 5000 == 0:
+            message = f"{NEEDLE} {seq % 64}"
+        entry = {"message": message, "raw": message, "level": "INFO", "parse": {"kind": "text", "confidence": 0.3}}
+        yield build_log_event_row(ingestion_id, seq, entry, "bench")
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--query", default="checksum mismatch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        org = Organization(name="bench-org")
+        db.add(org)
+        db.flush()
+        project = Project(name="bench-project", org_id=org.id)
+        db.add(project)
+        db.flush()
+
+        print(f"{'events':>10} {'scan ms':>10} {'contains ms':>12} {'fuzzy ms':>10}")
+        for size in args.sizes:
+            ingestion = Ingestion(project_id=project.id, source_type="paste", status="done")
+            db.add(ingestion)
+            db.flush()
+            copy_log_events(db, synthetic_rows(ingestion.id, size))
+            db.execute(text("ANALYZE log_events"))
+
+            def scan():
+                db.query(LogEvent).filter(
+                    LogEvent.ingestion_id == ingestion.id,
+                    func.strpos(func.lower(LogEvent.message), args.query.lower()) > 0,
+                ).order_by(LogEvent.seq.asc()).limit(101).all()
+
+            contains = lambda: list_ingestion_events(db, ingestion.id, limit=101, q=args.query, q_mode="contains")
+            fuzzy = lambda: list_ingestion_events(db, ingestion.id, limit=101, q=args.query, q_mode="fuzzy")
+            print(f"{size:>10} {timed(scan):>10.1f} {timed(contains):>12.1f} {timed(fuzzy):>10.1f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Microbenchmark for the findings rules engine.
+
+Compares the per-pattern loop (one search per regex) with the combined
+prefilter + per-rule alternations used by apply_rules_to_message, and checks
+that both return identical matches on a synthetic corpus.
+
+    python -m benchmarks.bench_findings_rules --messages 50000
+"""
+import argparse
+import random
+import time
+
+from app.utils.findings_rules import (
+    COMPILED_GENERIC_ERROR_RULES,
+    COMPILED_RULES,
+    apply_generic_error_rules,
+    apply_rules_to_message,
+)
+
+TEMPLATES = [
+    "GET /api/orders/{n} 200 in {n}ms",
+    "user {n} logged in from 10.0.{n}.1",
+    "cache miss for key session:{n}",
+    "connection refused while connecting to db-{n}:5432",
+    "password authentication failed for user \"app_{n}\"",
+    "upstream timed out (110: Connection timed out) while reading response header",
+    "HTTP 429 Too Many Requests for tenant {n}",
+    "java.lang.OutOfMemoryError: Java heap space",
+    "write failed: No space left on device",
+    "SSL handshake failed: certificate verify failed",
+    "payment failed: card declined (do not honor) order {n}",
+    "jwt expired at 2026-01-0{d}T10:00:00Z",
+    "unhandled exception in worker {n}",
+    "role \"reporting_{n}\" does not exist; permission denied for relation orders",
+    "scheduled shutdown of node {n} completed",
+]
+
+
+def build_corpus(n, seed=42):
+    rnd = random.Random(seed)
+    return [rnd.choice(TEMPLATES).format(n=rnd.randint(1, 99999), d=rnd.randint(1, 9)) for _ in range(n)]
+
+
+def legacy_rules(message):
+    message = message or ""
+    return [rule["id"] for rule in COMPILED_RULES if any(p.search(message) for p in rule["patterns"])]
+
+
+def legacy_generic(message):
+    message = message or ""
+    return any(p.search(message) for p in COMPILED_GENERIC_ERROR_RULES)
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    out = [fn(m) for m in corpus]
+    return time.perf_counter() - start, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50_000)
+    args = parser.parse_args()
+    corpus = build_corpus(args.messages)
+
+    legacy_time, legacy_out = timed(legacy_rules, corpus)
+    new_time, new_out = timed(lambda m: [x["rule_id"] for x in apply_rules_to_message(m)], corpus)
+    assert legacy_out == new_out, "rule matches differ"
+    print(f"rules:   legacy {legacy_time:.3f}s  combined {new_time:.3f}s  speedup {legacy_time / new_time:.1f}x")
+
+    legacy_time, legacy_out = timed(legacy_generic, corpus)
+    new_time, new_out = timed(apply_generic_error_rules, corpus)
+    assert legacy_out == new_out, "generic matches differ"
+    print(f"generic: legacy {legacy_time:.3f}s  combined {new_time:.3f}s  speedup {legacy_time / new_time:.1f}x")
+    print(f"{len(corpus)} messages, matches identical")
+
+
+if __name__ == "__main__":
+    main()
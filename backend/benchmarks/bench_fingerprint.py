@@ -0,0 +1,126 @@
+"""Throughput of make_fingerprint / redact_message in lines/sec.
+
+Compares the previous chain of re.sub calls against the single-pass
+normalizer, cold (unique signatures) and warm (repeating signatures, where
+the LRU memo answers), and counts lines whose output differs.
+
+The single-pass normalizer is not identical to the old chain for URLs that
+end in a uuid, ip, hex value or email: the chain replaced those first and
+then matched the URL only up to the placeholder's closing '>', leaving
+'<url>>'; the single pass gives '<url>'. The corpus includes such URLs and the
+differences are printed with examples, since those signatures fingerprint
+differently in ingestions processed before and after the change.
+
+It also differs for a token or long number glued directly to a uuid.
+UUID_PATTERN is the only class not anchored on word boundaries, so the chain's
+'<uuid>' created boundaries that the token and number patterns then matched
+against: 'span <token><uuid>'. The single pass sees the raw text, where a run
+of 12+ alphanumerics before the uuid reaches into its first group, giving
+'<token>-' followed by the rest of the uuid as text and numbers; a shorter run,
+or digits on either side, stays as plain text next to '<uuid>'.
+Reordering the alternation cannot recover the chain here, uuid is already first.
+
+    python -m benchmarks.bench_fingerprint --lines 200000
+"""
+import argparse
+import hashlib
+import random
+import re
+import time
+import uuid
+
+from app.utils import fingerprint as fp
+
+TEMPLATES = [
+    "user {u} logged in from {ip}",
+    "request {id} failed after {n}ms: upstream https://api.example.com/v1/orders/{n} returned 502",
+    "payment for order {n} declined, customer {email}",
+    "cache key sess_{tok} expired at 2026-01-0{d}t10:00:00z",
+    "worker pid {n} crashed with signal 11 at 0x7f{n}ab",
+    "   connection   reset by peer   {ip}:{n}  ",
+    # URLs containing another placeholder class; the normalizers disagree when it ends the URL
+    "GET https://api.example.com/v1/users/{u} returned 404",
+    "webhook http://{ip}:8080/hooks/{n} timed out",
+    "fetch https://cdn.example.com/blobs/0x{hx} failed",
+    "invite link https://app.example.com/join?email={email} expired",
+    # a token glued to a uuid; the chain matched the token against the '<' of '<uuid>'
+    "trace span {tok}{u} dropped",
+]
+
+
+def legacy_normalize(text):
+    text = text.strip().lower()
+    text = re.sub(fp.UUID_PATTERN, "<uuid>", text)
+    text = re.sub(fp.IP_PATTERN, "<ip>", text)
+    text = re.sub(fp.HEX_PATTERN, "<hex>", text)
+    text = re.sub(fp.EMAIL_PATTERN, "<email>", text)
+    text = re.sub(fp.URL_PATTERN, "<url>", text)
+    text = re.sub(fp.TOKEN_PATTERN, "<token>", text)
+    text = re.sub(fp.TIMESTAMP_PATTERN, "<timestamp>", text)
+    text = re.sub(r"\b\d{4,}\b", "<number>", text)
+    text = re.sub(r"\s+", " ", text)
+    return text
+
+
+def legacy_fingerprint(text):
+    return hashlib.sha1(legacy_normalize(text).encode("utf-8")).hexdigest()
+
+
+def build_corpus(n, distinct, seed=3):
+    rnd = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        pool.append(rnd.choice(TEMPLATES).format(
+            u=uuid.UUID(int=rnd.getrandbits(128)),
+            ip=".".join(str(rnd.randint(0, 255)) for _ in range(4)),
+            id=uuid.UUID(int=rnd.getrandbits(128)).hex[:12],
+            n=rnd.randint(1, 10**7),
+            email=f"user{rnd.randint(1, 999)}@example.com",
+            tok="".join(rnd.choice("abcdef0123456789") for _ in range(24)),
+            d=rnd.randint(1, 9),
+            hx="%x" % rnd.getrandbits(32),
+        ))
+    return [rnd.choice(pool) for _ in range(n)]
+
+
+def rate(fn, corpus):
+    start = time.perf_counter()
+    for line in corpus:
+        fn(line)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=2_000, help="distinct signatures in the warm corpus")
+    args = parser.parse_args()
+
+    cold = build_corpus(args.lines, args.lines)
+    warm = build_corpus(args.lines, args.distinct)
+
+    diffs = []
+    for line in cold:
+        old, new = legacy_normalize(line), fp.normalize_for_fingerprint(line)
+        if old != new:
+            diffs.append((old, new))
+    print(f"normalization differences: {len(diffs)}/{len(cold)} lines")
+    # one example per message shape
+    examples = {}
+    for old, new in diffs:
+        shape = re.sub(r"\d+", "N", old)
+        examples.setdefault(shape, (old, new))
+    for old, new in list(examples.values())[:5]:
+        print(f"  old {old}")
+        print(f"  new {new}")
+
+    print(f"legacy fingerprint       {rate(legacy_fingerprint, cold):>12,.0f} lines/sec")
+    fp.make_fingerprint.cache_clear()
+    print(f"single-pass (cold)       {rate(fp.make_fingerprint, cold):>12,.0f} lines/sec")
+    fp.make_fingerprint.cache_clear()
+    print(f"single-pass + memo (warm){rate(fp.make_fingerprint, warm):>12,.0f} lines/sec")
+    print(f"redact_message           {rate(fp.redact_message, cold):>12,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
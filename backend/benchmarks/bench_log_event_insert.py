@@ -0,0 +1,74 @@
+"""Compare log_events insert throughput: ORM add_all vs COPY FROM STDIN.
+
+Needs a migrated PostgreSQL database reachable via DATABASE_URL. Everything is
+written inside one transaction and rolled back at the end.
+
+    python -m benchmarks.bench_log_event_insert --rows 200000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.db import SessionLocal
+from app.models.organization import Organization
+from app.models.project import Project
+from app.models.ingestion import Ingestion
+from app.crud.log_events import build_log_event_row, copy_log_events, add_log_events
+from app.utils.fingerprint import make_fingerprint
+
+
+def synthetic_rows(ingestion_id, n):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for seq in range(1, n + 1):
+        message = f"GET /api/orders/{seq} failed: connection refused (attempt {seq % 5})"
+        entry = {
+            "ts": start + timedelta(milliseconds=seq),
+            "ts_raw": (start + timedelta(milliseconds=seq)).isoformat(),
+            "service": f"svc-{seq % 7}",
+            "level": "ERROR" if seq % 10 == 0 else "INFO",
+            "message": message,
+            "raw": f"{start.isoformat()} [svc-{seq % 7}] INFO {message}",
+            "attrs": {},
+            "parse": {"kind": "text", "confidence": 0.9},
+        }
+        yield build_log_event_row(ingestion_id, seq, entry, make_fingerprint(message))
+
+
+def run(label, fn, db, ingestion_id, n, chunk_size):
+    rows = list(synthetic_rows(ingestion_id, n))
+    start = time.perf_counter()
+    fn(db, rows, chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>4}: {n} rows in {elapsed:.2f}s -> {n / elapsed:,.0f} rows/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        org = Organization(name="bench-org")
+        db.add(org)
+        db.flush()
+        project = Project(name="bench-project", org_id=org.id)
+        db.add(project)
+        db.flush()
+        orm_ingestion = Ingestion(project_id=project.id, source_type="paste", status="processing")
+        copy_ingestion = Ingestion(project_id=project.id, source_type="paste", status="processing")
+        db.add_all([orm_ingestion, copy_ingestion])
+        db.flush()
+
+        orm_time = run("orm", lambda d, r, c: add_log_events(d, r, batch_size=c), db, orm_ingestion.id, args.rows, args.chunk_size)
+        copy_time = run("copy", lambda d, r, c: copy_log_events(d, r, chunk_size=c), db, copy_ingestion.id, args.rows, args.chunk_size)
+        print(f"speedup: {orm_time / copy_time:.1f}x")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Stored ingestion text: plain .txt vs seekable zstd frames.
+
+Writes the same synthetic upload with save_ingestion_text in each storage
+format, then streams it back with iter_ingestion_lines (the path the worker
+uses). Reports disk footprint, compression ratio, write time and read
+throughput, and checks every format returns the same lines.
+
+    python -m benchmarks.bench_storage --lines 1000000 --levels 1 3 9
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.utils import storage
+
+SERVICES = ["api", "auth", "billing", "worker", "scheduler", "gateway"]
+LEVELS = ["INFO"] * 12 + ["DEBUG"] * 4 + ["WARN"] * 2 + ["ERROR"]
+MESSAGES = [
+    "GET /v1/orders/{n} 200 in {ms}ms",
+    "user {n} logged in from 10.0.{a}.{b}",
+    "cache miss for key sess_{n}",
+    "payment for order {n} declined: card_declined",
+    "connection to db-{a} reset by peer, retrying in {ms}ms",
+    "job {n} finished in {ms}ms",
+]
+TRACE = [
+    "Traceback (most recent call last):",
+    '  File "/app/worker.py", line {a}, in run',
+    "    result = handler(payload)",
+    "ValueError: unexpected payload for job {n}",
+]
+
+
+def build_upload(n, seed=5):
+    rnd = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    out = []
+    for i in range(n):
+        ts = (start + timedelta(milliseconds=i * 13)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        fields = {"n": rnd.randint(1, 10**6), "ms": rnd.randint(1, 5000), "a": rnd.randint(0, 255), "b": rnd.randint(0, 255)}
+        level = rnd.choice(LEVELS)
+        out.append(f"{ts} [{rnd.choice(SERVICES)}] {level} {rnd.choice(MESSAGES).format(**fields)}")
+        if level == "ERROR" and rnd.random() < 0.3:
+            out.extend(line.format(**fields) for line in TRACE)
+    return "\n".join(out) + "\n"
+
+
+def run(ingestion_id, text, compression, level):
+    settings.storage_compression = compression
+    settings.storage_zstd_level = level
+
+    start = time.perf_counter()
+    storage.save_ingestion_text(ingestion_id, text)
+    write_time = time.perf_counter() - start
+    disk = os.path.getsize(storage.get_stored_ingestion_path(ingestion_id))
+
+    start = time.perf_counter()
+    lines = list(storage.iter_ingestion_lines(ingestion_id))
+    read_time = time.perf_counter() - start
+    return disk, write_time, read_time, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 9])
+    args = parser.parse_args()
+
+    text = build_upload(args.lines)
+    size = len(text.encode("utf-8"))
+    storage.STORAGE_DIR = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        runs = [("none", 0)] + [("zstd", level) for level in args.levels]
+        expected = None
+        print(f"upload {size / 1e6:.1f} MB, {args.lines:,} records")
+        for i, (compression, level) in enumerate(runs):
+            disk, write_time, read_time, lines = run(f"bench-{i}", text, compression, level)
+            if expected is None:
+                expected = lines
+            label = "plain" if compression == "none" else f"zstd -{level}"
+            print(
+                f"{label:<8} disk {disk / 1e6:8.1f} MB  ratio {size / disk:5.1f}x  "
+                f"write {size / 1e6 / write_time:7.0f} MB/s  read {size / 1e6 / read_time:7.0f} MB/s "
+                f"({len(lines) / read_time:>11,.0f} lines/sec)  same lines {lines == expected}"
+            )
+    finally:
+        shutil.rmtree(storage.STORAGE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Hot-path benchmark suite with saved baselines.
+
+Times the per-record functions of ingestion on one synthetic corpus
+(benchmarks.corpus): record grouping, parse_record, make_fingerprint,
+redact_message and apply_rules_to_message. Each benchmark processes the
+whole corpus per round and reports the best and median time per item.
+
+Save a run as a named baseline (benchmarks/baselines/<name>.json), then
+compare a later run against it; --max-regression makes the run exit non-zero
+when any benchmark's best time got slower by more than that percentage.
+Baselines are only comparable on the same machine and Python version, which
+are stored with them.
+
+    python -m benchmarks.bench_suite --records 50000 --save main
+    python -m benchmarks.bench_suite --records 50000 --compare main --max-regression 10
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.utils.findings_rules import apply_rules_to_message
+from app.utils.fingerprint import make_fingerprint, redact_message
+from app.utils.log_parser import group_lines_into_record, parse_record
+from app.utils.timestamps import TimestampParser
+from benchmarks.corpus import CorpusGenerator, parse_mix
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def build_inputs(records, mix, seed):
+    lines = list(CorpusGenerator(mix, seed).lines(records))
+    grouped = group_lines_into_record(lines)
+    parsed = [parse_record(record) for record in grouped]
+    return {
+        "lines": lines,
+        "records": grouped,
+        "signatures": [p["signature"] for p in parsed],
+        "messages": [p["message"] for p in parsed],
+    }
+
+
+def bench_group_lines(inputs):
+    lines = inputs["lines"]
+    return lambda: group_lines_into_record(lines), len(lines)
+
+
+def bench_parse_record(inputs):
+    records = inputs["records"]
+
+    def run():
+        # one parser per ingestion, as in iter_parsed_logs
+        ts_parser = TimestampParser()
+        for record in records:
+            parse_record(record, ts_parser)
+    return run, len(records)
+
+
+def bench_make_fingerprint(inputs):
+    signatures = inputs["signatures"]
+
+    def run():
+        # start every round cold; repeats inside the corpus still hit the memo, as in a real upload
+        make_fingerprint.cache_clear()
+        for signature in signatures:
+            make_fingerprint(signature)
+    return run, len(signatures)
+
+
+def bench_redact_message(inputs):
+    messages = inputs["messages"]
+
+    def run():
+        for message in messages:
+            redact_message(message)
+    return run, len(messages)
+
+
+def bench_apply_rules(inputs):
+    messages = inputs["messages"]
+
+    def run():
+        for message in messages:
+            apply_rules_to_message(message)
+    return run, len(messages)
+
+
+BENCHMARKS = {
+    "group_lines_into_record": bench_group_lines,
+    "parse_record": bench_parse_record,
+    "make_fingerprint": bench_make_fingerprint,
+    "redact_message": bench_redact_message,
+    "apply_rules_to_message": bench_apply_rules,
+}
+
+
+def measure(run, items, rounds):
+    run()  # warm-up: imports, regex caches
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "items": items,
+        "rounds": rounds,
+        "min_us": min(times) / items * 1e6,
+        "median_us": statistics.median(times) / items * 1e6,
+    }
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(name):
+    with open(baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(name, params, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    data = {
+        "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()},
+        "params": params,
+        "benchmarks": results,
+    }
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--mix", type=parse_mix, default=None, help="corpus format weights, see benchmarks.corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--save", metavar="NAME", help="store this run as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baselines/NAME.json")
+    parser.add_argument("--max-regression", type=float, metavar="PCT", help="with --compare, fail if a best time regressed by more than PCT%%")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    if baseline and (baseline["params"]["records"], baseline["params"]["seed"]) != (args.records, args.seed):
+        print(f"warning: baseline {args.compare} used --records {baseline['params']['records']} --seed {baseline['params']['seed']}")
+    if baseline and baseline["machine"]["python"] != platform.python_version():
+        print(f"warning: baseline {args.compare} was recorded on Python {baseline['machine']['python']}, this run is {platform.python_version()}")
+
+    inputs = build_inputs(args.records, args.mix, args.seed)
+    print(f"corpus: {len(inputs['lines']):,} lines, {len(inputs['records']):,} records, {args.rounds} rounds")
+    results = {}
+    regressions = []
+    for name in args.only or BENCHMARKS:
+        run, items = BENCHMARKS[name](inputs)
+        result = results[name] = measure(run, items, args.rounds)
+        line = f"{name:<24} min {result['min_us']:8.2f} us/item  median {result['median_us']:8.2f} us/item"
+        old = baseline["benchmarks"].get(name) if baseline else None
+        if old:
+            change = (result["min_us"] / old["min_us"] - 1) * 100
+            line += f"  vs {args.compare} {change:+6.1f}%"
+            if args.max_regression is not None and change > args.max_regression:
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        save_baseline(args.save, {"records": args.records, "seed": args.seed, "mix": args.mix, "rounds": args.rounds}, results)
+        print(f"saved baseline {baseline_path(args.save)}")
+    if regressions:
+        print(f"regressed by more than {args.max_regression:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
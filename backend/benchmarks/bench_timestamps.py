@@ -0,0 +1,89 @@
+"""Timestamp parsing: dateutil on every record vs TimestampParser.
+
+Generates timestamps in the shapes log_parser extracts (ISO with Z/offset,
+space-separated with UTC, space-separated naive), mostly in one dominant
+shape as in a real upload, plus values that match a shape but are not real
+dates (2024-02-30, hour 25), and checks that both paths return equal
+datetimes, or None where dateutil fails.
+
+    python -m benchmarks.bench_timestamps --lines 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil import parser as date_parser
+
+from app.utils.timestamps import TimestampParser
+
+SHAPES = [
+    lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z",
+    lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S.") + f"{dt.microsecond // 1000:03d} UTC",
+    lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"),
+    lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%S+02:00"),
+    lambda dt: dt.strftime("%b %d %Y %H:%M:%S"),  # unknown shape, falls back to dateutil
+]
+
+# match the fast-path regexes but are not valid dates
+INVALID = [
+    "2024-02-30T10:00:00Z",
+    "2024-13-01T10:00:00.123+02:00",
+    "2024-01-01 25:00:00 UTC",
+    "2024-01-01 25:00:00",
+    "2024-04-31 10:61:00",
+]
+
+
+def build_corpus(n, dominant=0.98, invalid=0.001, seed=11):
+    rnd = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    out = []
+    for i in range(n):
+        if rnd.random() < invalid:
+            out.append(rnd.choice(INVALID))
+            continue
+        dt = start + timedelta(milliseconds=i * 37)
+        shape = SHAPES[0] if rnd.random() < dominant else rnd.choice(SHAPES[1:])
+        out.append(shape(dt))
+    return out
+
+
+def parse_dateutil(ts):
+    # the pre-TimestampParser behaviour: unparseable timestamps are stored as None
+    try:
+        return date_parser.parse(ts)
+    except Exception:
+        return None
+
+
+def same(a, b):
+    if a is None or b is None:
+        return a is b
+    return a == b and (a.tzinfo is None) == (b.tzinfo is None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+    corpus = build_corpus(args.lines)
+
+    start = time.perf_counter()
+    expected = [parse_dateutil(ts) for ts in corpus]
+    dateutil_time = time.perf_counter() - start
+
+    ts_parser = TimestampParser()
+    start = time.perf_counter()
+    got = [ts_parser.parse(ts) for ts in corpus]
+    fast_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, got) if not same(a, b))
+    print(f"dateutil        {dateutil_time:7.2f}s  {len(corpus) / dateutil_time:>12,.0f} ts/sec")
+    print(f"TimestampParser {fast_time:7.2f}s  {len(corpus) / fast_time:>12,.0f} ts/sec")
+    print(f"invalid dates parsed to None: {sum(1 for ts in got if ts is None)}")
+    print(f"speedup {dateutil_time / fast_time:.1f}x, mismatches {mismatches}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    main()
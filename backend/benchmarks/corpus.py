@@ -0,0 +1,189 @@
+"""Synthetic log corpus in every format log_parser understands.
+
+Records are drawn from a weighted mix of line formats: ISO timestamps with
+a "service[pid]:" prefix, "YYYY-MM-DD HH:MM:SS UTC" with [service[pid]] or
+db[postgres-15], bracket timestamps, "svc:" prefixes with level=..., and
+JSON lines. Messages carry req-id and user tokens, and a share of ERROR
+records is followed by a Java or Python stack trace. Output is
+deterministic per seed, so corpora can be regenerated instead of checked in.
+
+    python -m benchmarks.corpus --records 100000 --mix iso=4,json=2,bracket=1 -o /tmp/corpus.log
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+FORMATS = ("iso", "utc", "db", "bracket", "colon", "json")
+DEFAULT_MIX = {"iso": 4, "utc": 2, "db": 1, "bracket": 1, "colon": 1, "json": 3}
+
+SERVICES = ["auth-service", "web-gateway", "billing", "order-api", "scheduler", "notifier"]
+DB_INSTANCES = ["postgres-15", "postgres-16", "mysql-8", "redis-7"]
+LEVELS = ["INFO"] * 14 + ["DEBUG"] * 4 + ["WARN"] * 3 + ["ERROR"] * 2 + ["CRITICAL"]
+
+MESSAGES = {
+    "INFO": [
+        "GET /v1/orders/{n} 200 in {ms}ms [req-id: {req}]",
+        "[user: user_{user}] logged in from 10.0.{a}.{b}",
+        "job {n} finished in {ms}ms",
+        "cache hit for key sess_{tok} user_{user}",
+        "published order:{n} to queue orders.created",
+    ],
+    "DEBUG": [
+        "cache miss for key sess_{tok}",
+        "acquired connection {a} from pool in {ms}ms",
+        "retrying txn:{n} attempt {a}",
+    ],
+    "WARN": [
+        "HTTP 429 Too Many Requests for tenant {n} [req-id: {req}]",
+        "slow query took {ms}ms: SELECT * FROM orders WHERE user_id = {n}",
+        "jwt expired at 2026-01-0{d}T10:00:00Z for user:{user}",
+        "upstream responded 503 after {ms}ms, retrying",
+    ],
+    "ERROR": [
+        "connection refused while connecting to db-{a}:5432 [req-id: {req}]",
+        "password authentication failed for user \"app_{n}\"",
+        "payment failed: card declined (do not honor) order:{n}",
+        "upstream timed out (110: Connection timed out) while reading response header",
+        "unhandled exception in worker {n} [req-id: {req}]",
+    ],
+    "CRITICAL": [
+        "java.lang.OutOfMemoryError: Java heap space",
+        "write failed: No space left on device",
+        "too many connections for role \"reporting_{n}\"",
+    ],
+}
+
+JAVA_TRACE = [
+    "java.lang.IllegalStateException: order {n} is not payable",
+    "\tat com.acme.orders.OrderService.pay(OrderService.java:{a})",
+    "\tat com.acme.orders.OrderController.checkout(OrderController.java:{b})",
+    "\tat org.springframework.web.servlet.FrameworkServlet.service(FrameworkServlet.java:897)",
+    "Caused by: java.net.SocketTimeoutException: Read timed out",
+    "\tat java.base/java.net.SocketInputStream.read(SocketInputStream.java:168)",
+    "\t... {d} more",
+]
+PYTHON_TRACE = [
+    "Traceback (most recent call last):",
+    '  File "/app/worker/tasks.py", line {a}, in run',
+    "    result = handler(payload)",
+    '  File "/app/worker/handlers.py", line {b}, in handle_order',
+    "    raise ValueError(f\"unexpected payload for job {{job_id}}\")",
+    "ValueError: unexpected payload for job {n}",
+]
+
+
+def parse_mix(spec: str) -> dict:
+    """'iso=4,json=2' -> {'iso': 4.0, 'json': 2.0}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in FORMATS:
+            raise ValueError(f"unknown format {name!r}, expected one of {', '.join(FORMATS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class CorpusGenerator:
+    def __init__(self, mix=None, seed=0, trace_rate=0.3, start=datetime(2026, 1, 1, tzinfo=timezone.utc)):
+        self.rnd = random.Random(seed)
+        mix = mix or DEFAULT_MIX
+        self.formats = list(mix)
+        self.weights = [mix[name] for name in self.formats]
+        self.trace_rate = trace_rate
+        self.ts = start
+
+    def _fields(self):
+        rnd = self.rnd
+        return {
+            "n": rnd.randint(1, 10**6),
+            "ms": rnd.randint(1, 5000),
+            "a": rnd.randint(1, 255),
+            "b": rnd.randint(1, 255),
+            "d": rnd.randint(1, 9),
+            "req": "%08x" % rnd.getrandbits(32),
+            "user": rnd.randint(1, 50_000),
+            "tok": "%024x" % rnd.getrandbits(96),
+        }
+
+    def _trace(self, fields):
+        template = JAVA_TRACE if self.rnd.random() < 0.5 else PYTHON_TRACE
+        return [line.format(**fields) for line in template]
+
+    def record(self) -> list[str]:
+        """One log record: a header line plus any stack trace lines"""
+        rnd = self.rnd
+        self.ts += timedelta(milliseconds=rnd.randint(1, 40))
+        fmt = rnd.choices(self.formats, self.weights)[0]
+        level = rnd.choice(LEVELS)
+        fields = self._fields()
+        message = rnd.choice(MESSAGES[level]).format(**fields)
+        service = rnd.choice(SERVICES)
+        pid = rnd.randint(1, 99)
+        iso = self.ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+        if fmt == "iso":
+            header = f"{iso} {service}[{pid}]: [{level}] {message}"
+        elif fmt == "utc":
+            stamp = self.ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            header = f"{stamp} UTC [{service}[{pid}]] [{level}] {message}"
+        elif fmt == "db":
+            stamp = self.ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            header = f"{stamp} UTC db[{rnd.choice(DB_INSTANCES)}]: [{level}] {message}"
+        elif fmt == "bracket":
+            header = f"[{iso}] [{service}[{pid}]] [{level}] {message}"
+        elif fmt == "colon":
+            stamp = self.ts.strftime("%Y-%m-%d %H:%M:%S")
+            header = f"{stamp} {service}: level={level.lower()} {message}"
+        else:
+            header = json.dumps({
+                "ts": iso,
+                "level": level.lower(),
+                "service": service,
+                "msg": message,
+                "req_id": fields["req"],
+                "user": f"u{fields['user']}",
+                "latency_ms": fields["ms"],
+            })
+
+        lines = [header]
+        # JSON lines carry traces in a field, never as continuation lines
+        if fmt != "json" and level in ("ERROR", "CRITICAL") and rnd.random() < self.trace_rate:
+            lines.extend(self._trace(fields))
+        return lines
+
+    def records(self, n: int):
+        for _ in range(n):
+            yield self.record()
+
+    def lines(self, n: int):
+        for record in self.records(n):
+            yield from record
+
+
+def generate_corpus(records: int, mix=None, seed=0, trace_rate=0.3) -> str:
+    return "\n".join(CorpusGenerator(mix, seed, trace_rate).lines(records)) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--mix", type=parse_mix, default=None, help=f"weights per format ({', '.join(FORMATS)}), e.g. iso=4,json=2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-rate", type=float, default=0.3, help="share of ERROR/CRITICAL text records followed by a stack trace")
+    parser.add_argument("-o", "--output", help="file to write, stdout by default")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for line in CorpusGenerator(args.mix, args.seed, args.trace_rate).lines(args.records):
+            out.write(line + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
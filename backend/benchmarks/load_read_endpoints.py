@@ -0,0 +1,106 @@
+"""Load test for the dashboard read endpoints at increasing concurrency.
+
+Polls overview, groups, events and findings of one finished ingestion from
+N concurrent clients (each with its own keep-alive connection) and reports
+throughput, latency percentiles and errors per concurrency level. Sync
+handlers top out once anyio's 40 worker threads are busy, which shows up
+as flat req/s with latency growing linearly in N; the async endpoints keep
+scaling until Postgres or the CPU saturates.
+
+To compare before and after, run it once against a server started from the
+previous commit and once against the current tree, with the response cache
+off (INGESTION_CACHE_ENABLED=false) so every request reaches the database:
+
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.load_read_endpoints --token $TOKEN \\
+        --org $ORG --project $PROJECT --ingestion $INGESTION --concurrency 10 50 200
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+ENDPOINTS = {
+    "overview": "/overview",
+    "groups": "/groups?limit=10",
+    "events": "/events?limit=100",
+    "findings": "/findings",
+}
+
+
+def client_loop(base, prefix, paths, token, deadline, latencies, errors, lock):
+    conn_cls = http.client.HTTPSConnection if base.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(base.hostname, base.port, timeout=30)
+    headers = {"Authorization": f"Bearer {token}"}
+    local, failed, i = [], 0, 0
+    while time.perf_counter() < deadline:
+        path = prefix + paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                failed += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = conn_cls(base.hostname, base.port, timeout=30)
+            continue
+        local.append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors[0] += failed
+
+
+def run_level(base, prefix, paths, token, concurrency, duration):
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_loop, args=(base, prefix, paths, token, deadline, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="access token of a member of the org")
+    parser.add_argument("--org", required=True)
+    parser.add_argument("--project", required=True)
+    parser.add_argument("--ingestion", required=True, help="id of a finished ingestion")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS))
+    args = parser.parse_args()
+
+    base = urlsplit(args.base_url)
+    prefix = f"{base.path.rstrip('/')}/api/v1/orgs/{args.org}/projects/{args.project}/ingestions/{args.ingestion}"
+    paths = [ENDPOINTS[name] for name in args.endpoints]
+    print(f"endpoints: {', '.join(args.endpoints)}  duration {args.duration:.0f}s per level")
+    for concurrency in args.concurrency:
+        latencies, errors = run_level(base, prefix, paths, args.token, concurrency, args.duration)
+        if not latencies:
+            print(f"c={concurrency:<5} no successful requests, {errors} errors")
+            continue
+        latencies.sort()
+        p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+        print(
+            f"c={concurrency:<5} {len(latencies) / args.duration:8.1f} req/s  "
+            f"p50 {p(0.50):7.1f}ms  p95 {p(0.95):7.1f}ms  p99 {p(0.99):7.1f}ms  "
+            f"mean {statistics.fmean(latencies) * 1000:7.1f}ms  errors {errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from app.config import settings
 from app.db import Base
 from app.models.ai_analysis import AiAnalysis
 from app.models.finding import Finding
+from app.models.fingerprint_group import FingerprintGroup
 from app.models.ingestion import Ingestion
 from app.models.log_event import LogEvent
 from app.models.project import Project
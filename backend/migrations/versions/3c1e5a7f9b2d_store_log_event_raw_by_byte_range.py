@@ -0,0 +1,34 @@
+"""store log event raw by byte range
+
+Revision ID: 3c1e5a7f9b2d
+Revises: 856a278d6dda
+Create Date: 2026-10-18 14:02:11.406127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e5a7f9b2d'
+down_revision: Union[str, Sequence[str], None] = '856a278d6dda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('log_events', sa.Column('raw_offset', sa.BigInteger(), nullable=True))
+    op.add_column('log_events', sa.Column('raw_length', sa.Integer(), nullable=True))
+    op.alter_column('log_events', 'raw', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # raw text of range-stored events only exists in the ingestion files; keep the message so raw can be NOT NULL again
+    op.execute("UPDATE log_events SET raw = message WHERE raw IS NULL")
+    op.alter_column('log_events', 'raw', existing_type=sa.Text(), nullable=False)
+    op.drop_column('log_events', 'raw_length')
+    op.drop_column('log_events', 'raw_offset')
@@ -0,0 +1,37 @@
+"""add composite filter indexes for log_events
+
+Revision ID: 856a278d6dda
+Revises: 8b97025b5862
+Create Date: 2026-10-18 12:20:33.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '856a278d6dda'
+down_revision: Union[str, Sequence[str], None] = '8b97025b5862'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_log_events_ingestion_id_fingerprint_seq', 'log_events', ['ingestion_id', 'fingerprint', 'seq'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_log_events_ingestion_id_level_seq', 'log_events', ['ingestion_id', 'level', 'seq'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_log_events_ingestion_id_service_seq', 'log_events', ['ingestion_id', 'service', 'seq'], unique=False, postgresql_concurrently=True)
+        # superseded by ix_log_events_ingestion_id_fingerprint_seq
+        op.drop_index('ix_log_events_ingestion_id_fingerprint', table_name='log_events', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_log_events_ingestion_id_fingerprint', 'log_events', ['ingestion_id', 'fingerprint'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_log_events_ingestion_id_service_seq', table_name='log_events', postgresql_concurrently=True)
+        op.drop_index('ix_log_events_ingestion_id_level_seq', table_name='log_events', postgresql_concurrently=True)
+        op.drop_index('ix_log_events_ingestion_id_fingerprint_seq', table_name='log_events', postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""add trigram index on log_event message
+
+Revision ID: 8b97025b5862
+Revises: 9cd3a2183aad
+Create Date: 2026-10-18 11:41:09.530862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b97025b5862'
+down_revision: Union[str, Sequence[str], None] = '9cd3a2183aad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # built concurrently so existing ingestions stay readable while the index is created
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_log_events_message_trgm', 'log_events', ['message'], unique=False,
+            postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'}, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_log_events_message_trgm', table_name='log_events', postgresql_concurrently=True)
@@ -0,0 +1,34 @@
+"""add ai analysis job status
+
+Revision ID: 9e4b2c6d1a7f
+Revises: 3c1e5a7f9b2d
+Create Date: 2026-10-18 16:41:27.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2c6d1a7f'
+down_revision: Union[str, Sequence[str], None] = '3c1e5a7f9b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # analyses stored before insights ran in the background are all complete
+    op.add_column('ai_analyses', sa.Column('status', sa.String(), nullable=False, server_default='done'))
+    op.alter_column('ai_analyses', 'status', server_default=None)
+    op.add_column('ai_analyses', sa.Column('error', sa.Text(), nullable=True))
+    op.add_column('ai_analyses', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_analyses', 'updated_at')
+    op.drop_column('ai_analyses', 'error')
+    op.drop_column('ai_analyses', 'status')
@@ -0,0 +1,92 @@
+"""add fingerprint_groups table
+
+Revision ID: f0aed97c71e1
+Revises: fe22b6188068
+Create Date: 2026-10-18 10:12:41.204511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0aed97c71e1'
+down_revision: Union[str, Sequence[str], None] = 'fe22b6188068'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fingerprint_groups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('ingestion_id', sa.UUID(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('first_seen', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_seen', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('latest_event_id', sa.UUID(), nullable=False),
+    sa.Column('sample_event_id', sa.UUID(), nullable=False),
+    sa.Column('latest_ts_event_id', sa.UUID(), nullable=False),
+    sa.Column('level_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('service_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['ingestion_id'], ['ingestions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('ingestion_id', 'fingerprint', name='uq_fingerprint_groups_ingestion_id_fingerprint')
+    )
+    op.create_index('ix_fingerprint_groups_ingestion_id_count', 'fingerprint_groups', ['ingestion_id', sa.text('count DESC'), 'fingerprint'], unique=False)
+
+    # Backfill summaries for ingestions processed before this table existed
+    op.execute("""
+        INSERT INTO fingerprint_groups (
+            id, ingestion_id, fingerprint, count, first_seen, last_seen,
+            latest_event_id, sample_event_id, latest_ts_event_id, level_counts, service_counts
+        )
+        WITH agg AS (
+            SELECT ingestion_id, fingerprint, count(*) AS count, min(ts) AS first_seen, max(ts) AS last_seen
+            FROM log_events GROUP BY ingestion_id, fingerprint
+        ),
+        latest AS (
+            SELECT DISTINCT ON (ingestion_id, fingerprint) ingestion_id, fingerprint, id
+            FROM log_events ORDER BY ingestion_id, fingerprint, seq DESC
+        ),
+        sample AS (
+            SELECT DISTINCT ON (ingestion_id, fingerprint) ingestion_id, fingerprint, id
+            FROM log_events ORDER BY ingestion_id, fingerprint, ts DESC NULLS LAST, seq ASC
+        ),
+        latest_ts AS (
+            SELECT DISTINCT ON (ingestion_id, fingerprint) ingestion_id, fingerprint, id
+            FROM log_events ORDER BY ingestion_id, fingerprint, ts DESC NULLS LAST, seq DESC
+        ),
+        levels AS (
+            SELECT ingestion_id, fingerprint, jsonb_object_agg(level, c) AS level_counts
+            FROM (
+                SELECT ingestion_id, fingerprint, coalesce(nullif(level, ''), 'UNKNOWN') AS level, count(*) AS c
+                FROM log_events GROUP BY 1, 2, 3
+            ) l GROUP BY ingestion_id, fingerprint
+        ),
+        services AS (
+            SELECT ingestion_id, fingerprint, jsonb_object_agg(service, c) AS service_counts
+            FROM (
+                SELECT ingestion_id, fingerprint, coalesce(nullif(service, ''), 'unknown') AS service, count(*) AS c
+                FROM log_events GROUP BY 1, 2, 3
+            ) s GROUP BY ingestion_id, fingerprint
+        )
+        SELECT gen_random_uuid(), agg.ingestion_id, agg.fingerprint, agg.count, agg.first_seen, agg.last_seen,
+               latest.id, sample.id, latest_ts.id, levels.level_counts, services.service_counts
+        FROM agg
+        JOIN latest USING (ingestion_id, fingerprint)
+        JOIN sample USING (ingestion_id, fingerprint)
+        JOIN latest_ts USING (ingestion_id, fingerprint)
+        JOIN levels USING (ingestion_id, fingerprint)
+        JOIN services USING (ingestion_id, fingerprint)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fingerprint_groups_ingestion_id_count', table_name='fingerprint_groups')
+    op.drop_table('fingerprint_groups')
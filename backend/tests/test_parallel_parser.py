@@ -0,0 +1,35 @@
+import unittest
+
+import billiard
+
+from app.utils.fingerprint import make_fingerprint
+from app.utils.log_parser import iter_parsed_logs
+from app.utils.parallel_parser import iter_parsed_logs_parallel
+from benchmarks.corpus import CorpusGenerator
+
+def _parse_in_worker_child(lines):
+    # runs in a daemonic pool process, like a task in a Celery prefork child
+    assert billiard.current_process().daemon
+    return list(iter_parsed_logs_parallel(lines, workers=2, shard_lines=500))
+
+class ParallelParserTest(unittest.TestCase):
+    def setUp(self):
+        self.lines = list(CorpusGenerator(seed=3).lines(3000))
+
+    def expected(self):
+        records = []
+        for record in iter_parsed_logs(self.lines):
+            record["fingerprint"] = make_fingerprint(record.get("signature"))
+            records.append(record)
+        return records
+
+    def test_matches_sequential_parser(self):
+        self.assertEqual(list(iter_parsed_logs_parallel(self.lines, workers=2, shard_lines=500)), self.expected())
+
+    def test_runs_inside_prefork_child(self):
+        with billiard.Pool(processes=1) as worker:
+            records = worker.apply(_parse_in_worker_child, (self.lines,))
+        self.assertEqual(records, self.expected())
+
+if __name__ == "__main__":
+    unittest.main()
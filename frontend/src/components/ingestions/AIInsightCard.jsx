@@ -27,7 +27,8 @@ function AIInsightCard({
     setLoading(true)
     setError(null)
     try {
-      const data = await generateInsight(orgId, projectId, ingestionId, scopeType, scopeId)
+      // show the explanation as it is written; the final event replaces it with the stored text
+      const data = await generateInsight(orgId, projectId, ingestionId, scopeType, scopeId, setInsight)
       setInsight(data?.insight || '')
       setCached(Boolean(data?.cached))
     } catch (err) {
@@ -163,7 +163,10 @@ export const getFindingDetails = async (orgId, projectId, ingestionId, findingId
   return response.data
 }
 
-export const generateInsight = async (orgId, projectId, ingestionId, scopeType, scopeId) => {
+const INSIGHT_POLL_INTERVAL_MS = 1500
+const INSIGHT_POLL_TIMEOUT_MS = 120000
+
+export const generateInsight = async (orgId, projectId, ingestionId, scopeType, scopeId, onDelta) => {
   const body = {
     scope_type: scopeType,
   }
@@ -176,6 +179,88 @@ export const generateInsight = async (orgId, projectId, ingestionId, scopeType,
     `/orgs/${orgId}/projects/${projectId}/ingestions/${ingestionId}/insights`,
     body
   )
+  // generation runs in the background; stream its text, or poll the job until it settles
+  const jobId = response.data.job_id
+  if (onDelta) {
+    try {
+      return await streamInsight(orgId, projectId, ingestionId, jobId, onDelta)
+    } catch (err) {
+      // a failed job is final; a broken stream falls back to polling
+      if (err.insightFailed) {
+        throw err
+      }
+    }
+  }
+  const deadline = Date.now() + INSIGHT_POLL_TIMEOUT_MS
+  while (Date.now() < deadline) {
+    const job = await getInsightStatus(orgId, projectId, ingestionId, jobId)
+    if (job.status === 'done') {
+      return job
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Failed to generate insight')
+    }
+    await new Promise((resolve) => setTimeout(resolve, INSIGHT_POLL_INTERVAL_MS))
+  }
+  throw new Error('Insight generation is taking longer than expected, try again shortly')
+}
+
+// Server-Sent Events over fetch, since EventSource cannot send the Authorization header
+export const streamInsight = async (orgId, projectId, ingestionId, jobId, onDelta) => {
+  const token = localStorage.getItem('token')
+  const response = await fetch(
+    `${API_BASE_URL}/orgs/${orgId}/projects/${projectId}/ingestions/${ingestionId}/insights/${jobId}/stream`,
+    { headers: token ? { Authorization: `Bearer ${token}` } : {} }
+  )
+  if (!response.ok || !response.body) {
+    throw new Error(`Insight stream failed with status ${response.status}`)
+  }
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  let text = ''
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) {
+      break
+    }
+    buffer += value
+    let end
+    while ((end = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, end)
+      buffer = buffer.slice(end + 2)
+      let event = 'message'
+      let data = ''
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) {
+          event = line.slice(7)
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6)
+        }
+      }
+      // keepalive comments carry no data
+      if (!data) {
+        continue
+      }
+      const payload = JSON.parse(data)
+      if (event === 'delta') {
+        text += payload.text
+        onDelta(text)
+      } else if (event === 'done') {
+        return { status: 'done', insight: payload.insight }
+      } else if (event === 'failed') {
+        const err = new Error(payload.error || 'Failed to generate insight')
+        err.insightFailed = true
+        throw err
+      }
+    }
+  }
+  throw new Error('Insight stream ended before the job finished')
+}
+
+export const getInsightStatus = async (orgId, projectId, ingestionId, jobId) => {
+  const response = await api.get(
+    `/orgs/${orgId}/projects/${projectId}/ingestions/${ingestionId}/insights/${jobId}`
+  )
   return response.data
 }
 